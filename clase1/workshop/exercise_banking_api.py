@@ -5,34 +5,89 @@ This API handles basic banking operations.
 Identify the antipatterns and design problems in this code.
 """
 
+import os
+import re
+import json
+import mmap
 import time
+import random
+import struct
+import asyncio
 import hashlib
+import threading
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 bank_accounts = {}
 global_transactions = []
+transaction_index = {}
+account_locks = {}
+account_locks_guard = threading.Lock()
 system_configuration = {
     "currency": "USD",
     "transfer_limit": 10000,
     "commission": 0.02
 }
 
+account_interest_rates = {
+    "savings": 0.02,
+    "checking": 0.001,
+    "business": 0.005
+}
+
+batch_operations = {"deposit": 1, "withdraw": 2, "transfer": 3}
+batch_errors = [
+    None,
+    "Cuenta no encontrada",
+    "Monto inválido",
+    "Saldo insuficiente",
+    "Límite diario excedido",
+    "Monto excede límite",
+    "Misma cuenta",
+    "Cuenta no activa",
+    "Operación no válida"
+]
+
 
 class banking_service:
     
-    def __init__(self):
+    def __init__(self, journal=None, concurrent=False):
         self.accounts = bank_accounts
         self.transactions = global_transactions
+        self.transaction_index = transaction_index
+        self.journal = journal
+        self.concurrent = concurrent
         self.sessions = {}
-        self.logs = []
-        self.notifications = []
+        self.logs = log_handler()
+        self.notifications = notification_handler()
         self.limits = {}
         self.blocks = {}
         self.failed_attempts = {}
         
     def execute_operation(self, operation, parameters):
-        self.logs.append(f"{datetime.now()}: Ejecutando {operation}")
+        if not self.concurrent:
+            return self.run_operation(operation, parameters)
+        
+        numbers = [parameters.get(key) for key in ("account_number", "source_account", "destination_account")]
+        if operation != "create_account":
+            numbers = [number for number in numbers if number in self.accounts]
+        with account_lock_set(numbers):
+            return self.run_operation(operation, parameters)
+    
+    def execute_parallel(self, operations, workers=8):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda item: self.execute_operation(*item), operations))
+    
+    def run_operation(self, operation, parameters):
+        self.logs.log(f"Ejecutando {operation}")
         
         if operation == "create_account":
             account_number = parameters.get("account_number")
@@ -41,6 +96,8 @@ class banking_service:
             initial_balance = parameters.get("initial_balance", 0)
             
             if account_number and holder:
+                if self.journal is not None and len(account_number.encode()) > journal_account_size:
+                    return {"success": False, "error": "Número de cuenta demasiado largo"}
                 if account_number not in self.accounts:
                     self.accounts[account_number] = {
                         "holder": holder,
@@ -52,20 +109,16 @@ class banking_service:
                     }
                     
                     if type == "savings":
-                        self.accounts[account_number]["interest"] = 0.02
+                        self.accounts[account_number]["interest"] = account_interest_rates["savings"]
                         self.accounts[account_number]["daily_withdrawal_limit"] = 1000
                     elif type == "checking":
-                        self.accounts[account_number]["interest"] = 0.001
+                        self.accounts[account_number]["interest"] = account_interest_rates["checking"]
                         self.accounts[account_number]["daily_withdrawal_limit"] = 5000
                     elif type == "business":
-                        self.accounts[account_number]["interest"] = 0.005
+                        self.accounts[account_number]["interest"] = account_interest_rates["business"]
                         self.accounts[account_number]["daily_withdrawal_limit"] = 50000
                     
-                    self.notifications.append({
-                        "account": account_number,
-                        "message": "Cuenta creada exitosamente",
-                        "timestamp": datetime.now()
-                    })
+                    self.notifications.send(account_number, "Cuenta creada exitosamente")
                     
                     return {"success": True, "account_number": account_number}
                 else:
@@ -83,7 +136,7 @@ class banking_service:
                     self.accounts[account_number]["balance"] += amount
                     
                     transaction = {
-                        "id": len(self.transactions) + 1,
+                        "id": self.next_transaction_id(),
                         "type": "deposit",
                         "account": account_number,
                         "amount": amount,
@@ -92,15 +145,10 @@ class banking_service:
                         "date": datetime.now()
                     }
                     
-                    self.transactions.append(transaction)
-                    self.accounts[account_number]["transactions"].append(transaction["id"])
+                    self.register_transaction(transaction)
                     
                     if amount > 10000:
-                        self.notifications.append({
-                            "account": account_number,
-                            "message": "Depósito grande detectado",
-                            "timestamp": datetime.now()
-                        })
+                        self.notifications.send(account_number, "Depósito grande detectado")
                     
                     return {"success": True, "new_balance": self.accounts[account_number]["balance"]}
                 else:
@@ -120,22 +168,20 @@ class banking_service:
                 
                 if amount > 0 and amount <= account["balance"]:
                     daily_limit = account.get("daily_withdrawal_limit", 1000)
+                    today = datetime.now().date()
                     
-                    withdrawals_today = 0
-                    for trans_id in account["transactions"]:
-                        for trans in self.transactions:
-                            if trans["id"] == trans_id and trans["type"] == "withdrawal":
-                                if trans["date"].date() == datetime.now().date():
-                                    withdrawals_today += trans["amount"]
+                    if account.get("withdrawals_date") != today:
+                        account["withdrawals_date"] = today
+                        account["withdrawals_today"] = 0
                     
-                    if withdrawals_today + amount > daily_limit:
+                    if account["withdrawals_today"] + amount > daily_limit:
                         return {"success": False, "error": "Límite diario excedido"}
                     
                     previous_balance = account["balance"]
                     account["balance"] -= amount
                     
                     transaction = {
-                        "id": len(self.transactions) + 1,
+                        "id": self.next_transaction_id(),
                         "type": "withdrawal",
                         "account": account_number,
                         "amount": amount,
@@ -144,8 +190,8 @@ class banking_service:
                         "date": datetime.now()
                     }
                     
-                    self.transactions.append(transaction)
-                    account["transactions"].append(transaction["id"])
+                    self.register_transaction(transaction)
+                    account["withdrawals_today"] += amount
                     
                     return {"success": True, "new_balance": account["balance"]}
                 else:
@@ -173,7 +219,7 @@ class banking_service:
                                 self.accounts[destination_account]["balance"] += amount
                                 
                                 outgoing_transaction = {
-                                    "id": len(self.transactions) + 1,
+                                    "id": self.next_transaction_id(),
                                     "type": "transfer_out",
                                     "account": source_account,
                                     "destination_account": destination_account,
@@ -184,11 +230,10 @@ class banking_service:
                                     "date": datetime.now()
                                 }
                                 
-                                self.transactions.append(outgoing_transaction)
-                                self.accounts[source_account]["transactions"].append(outgoing_transaction["id"])
+                                self.register_transaction(outgoing_transaction)
                                 
                                 incoming_transaction = {
-                                    "id": len(self.transactions) + 1,
+                                    "id": self.next_transaction_id(),
                                     "type": "transfer_in",
                                     "account": destination_account,
                                     "source_account": source_account,
@@ -198,8 +243,7 @@ class banking_service:
                                     "date": datetime.now()
                                 }
                                 
-                                self.transactions.append(incoming_transaction)
-                                self.accounts[destination_account]["transactions"].append(incoming_transaction["id"])
+                                self.register_transaction(incoming_transaction)
                                 
                                 return {"success": True, "commission": commission}
                             else:
@@ -227,30 +271,573 @@ class banking_service:
         
         else:
             return {"success": False, "error": "Operación no válida"}
+    
+    def execute_batch(self, operations):
+        if not self.concurrent:
+            return self.run_batch(operations)
+        
+        numbers = set()
+        for operation, parameters in operations:
+            for key in ("account_number", "source_account", "destination_account"):
+                if parameters.get(key) in self.accounts:
+                    numbers.add(parameters[key])
+        with account_lock_set(numbers):
+            return self.run_batch(operations)
+    
+    def run_batch(self, operations):
+        self.logs.log(f"Ejecutando lote de {len(operations)} operaciones")
+        
+        count = len(operations)
+        kinds = array("b", bytes(count))
+        sources = array("q", [-1]) * count
+        destinations = array("q", [-1]) * count
+        amounts = [0] * count
+        result = batch_result(kinds)
+        codes = result.codes
+        values = result.values
+        
+        slots = {}
+        numbers = []
+        
+        def slot(account_number):
+            index = slots.get(account_number)
+            if index is None:
+                if account_number not in self.accounts:
+                    return -1
+                index = slots[account_number] = len(numbers)
+                numbers.append(account_number)
+            return index
+        
+        for i, (operation, parameters) in enumerate(operations):
+            kind = batch_operations.get(operation, 0)
+            kinds[i] = kind
+            if kind == 0:
+                codes[i] = 8
+                continue
+            
+            if kind == 3:
+                source = slot(parameters.get("source_account"))
+                destination = slot(parameters.get("destination_account"))
+                if source < 0 or destination < 0:
+                    codes[i] = 1
+                    continue
+                sources[i] = source
+                destinations[i] = destination
+            else:
+                source = slot(parameters.get("account_number"))
+                if source < 0:
+                    codes[i] = 1
+                    continue
+                sources[i] = source
+            
+            amount = parameters.get("amount")
+            if not isinstance(amount, (int, float)):
+                codes[i] = 2
+                continue
+            amounts[i] = amount
+        
+        today = datetime.now().date()
+        balances = [self.accounts[number]["balance"] for number in numbers]
+        withdrawn = [0] * len(numbers)
+        limits = [0] * len(numbers)
+        active = array("b", bytes(len(numbers)))
+        for index, number in enumerate(numbers):
+            account = self.accounts[number]
+            if account.get("withdrawals_date") == today:
+                withdrawn[index] = account["withdrawals_today"]
+            limits[index] = account.get("daily_withdrawal_limit", 1000)
+            active[index] = account["status"] == "active"
+        
+        commission_rate = system_configuration["commission"]
+        transfer_limit = system_configuration["transfer_limit"]
+        now = datetime.now()
+        ledger = []
+        large_deposits = []
+        
+        for i in range(count):
+            if codes[i]:
+                continue
+            kind = kinds[i]
+            source = sources[i]
+            amount = amounts[i]
+            
+            if kind == 1:
+                if amount > 0:
+                    previous_balance = balances[source]
+                    balances[source] += amount
+                    values[i] = balances[source]
+                    ledger.append({
+                        "id": None,
+                        "type": "deposit",
+                        "account": numbers[source],
+                        "amount": amount,
+                        "previous_balance": previous_balance,
+                        "new_balance": balances[source],
+                        "date": now
+                    })
+                    if amount > 10000:
+                        large_deposits.append(numbers[source])
+                else:
+                    codes[i] = 2
+            elif kind == 2:
+                if not active[source]:
+                    codes[i] = 7
+                elif amount > 0 and amount <= balances[source]:
+                    if withdrawn[source] + amount > limits[source]:
+                        codes[i] = 4
+                    else:
+                        previous_balance = balances[source]
+                        balances[source] -= amount
+                        withdrawn[source] += amount
+                        values[i] = balances[source]
+                        ledger.append({
+                            "id": None,
+                            "type": "withdrawal",
+                            "account": numbers[source],
+                            "amount": amount,
+                            "previous_balance": previous_balance,
+                            "new_balance": balances[source],
+                            "date": now
+                        })
+                else:
+                    codes[i] = 3
+            else:
+                destination = destinations[i]
+                commission = amount * commission_rate
+                if source == destination:
+                    codes[i] = 6
+                elif amount <= 0:
+                    codes[i] = 2
+                elif balances[source] < amount + commission:
+                    codes[i] = 3
+                elif amount > transfer_limit:
+                    codes[i] = 5
+                else:
+                    previous_balance = balances[source]
+                    previous_balance_destination = balances[destination]
+                    balances[source] -= amount + commission
+                    balances[destination] += amount
+                    values[i] = commission
+                    ledger.append({
+                        "id": None,
+                        "type": "transfer_out",
+                        "account": numbers[source],
+                        "destination_account": numbers[destination],
+                        "amount": amount,
+                        "commission": commission,
+                        "previous_balance": previous_balance,
+                        "new_balance": balances[source],
+                        "date": now
+                    })
+                    ledger.append({
+                        "id": None,
+                        "type": "transfer_in",
+                        "account": numbers[destination],
+                        "source_account": numbers[source],
+                        "amount": amount,
+                        "previous_balance": previous_balance_destination,
+                        "new_balance": balances[destination],
+                        "date": now
+                    })
+        
+        self.register_transactions(ledger)
+        for account_number in large_deposits:
+            self.notifications.send(account_number, "Depósito grande detectado")
+        
+        for index, number in enumerate(numbers):
+            account = self.accounts[number]
+            account["balance"] = balances[index]
+            if withdrawn[index]:
+                account["withdrawals_date"] = today
+                account["withdrawals_today"] = withdrawn[index]
+        
+        return result
+    
+    def next_transaction_id(self):
+        if self.journal is not None:
+            return None
+        return transaction_ids.next()
+    
+    def register_transaction(self, transaction):
+        if self.journal is not None:
+            self.journal.append(transaction)
+        else:
+            self.transactions.append(transaction)
+            self.transaction_index[transaction["id"]] = transaction
+        self.accounts[transaction["account"]]["transactions"].append(transaction["id"])
+    
+    def register_transactions(self, transactions):
+        if self.journal is not None:
+            self.journal.append_many(transactions)
+        else:
+            first_id = transaction_ids.reserve(len(transactions))
+            for transaction_id, transaction in enumerate(transactions, first_id):
+                transaction["id"] = transaction_id
+            self.transactions.extend(transactions)
+            self.transaction_index.update((transaction["id"], transaction) for transaction in transactions)
+        accounts = self.accounts
+        for transaction in transactions:
+            accounts[transaction["account"]]["transactions"].append(transaction["id"])
+    
+    def get_transaction(self, transaction_id):
+        if self.journal is not None:
+            return self.journal.get(transaction_id)
+        return self.transaction_index.get(transaction_id)
+    
+    def restore_from_journal(self):
+        if self.journal is None:
+            return 0
+        return self.journal.replay(self.accounts)
+
+
+class async_banking_service:
+    
+    def __init__(self, service=None, batch_interval=0.002, max_batch=1000):
+        self.service = service or banking_service()
+        self.batch_interval = batch_interval
+        self.max_batch = max_batch
+        self.balance_lookups = {}
+        self.pending_writes = []
+        self.flush_handle = None
+        self.coalesced = 0
+        self.batches = 0
+    
+    async def execute(self, operation, params):
+        if operation == "check_balance":
+            return dict(await self.check_balance(params.get("account_number")))
+        
+        if operation in batch_operations:
+            future = asyncio.get_running_loop().create_future()
+            self.pending_writes.append((operation, params, future))
+            if len(self.pending_writes) >= self.max_batch:
+                self.flush_writes()
+            elif self.flush_handle is None:
+                self.flush_handle = asyncio.get_running_loop().call_later(self.batch_interval, self.flush_writes)
+            return await future
+        
+        return self.service.execute_operation(operation, params)
+    
+    def check_balance(self, account_number):
+        lookup = self.balance_lookups.get(account_number)
+        if lookup is not None:
+            self.coalesced += 1
+            return asyncio.shield(lookup)
+        
+        lookup = asyncio.get_running_loop().create_future()
+        self.balance_lookups[account_number] = lookup
+        asyncio.get_running_loop().call_soon(self.resolve_balance, account_number)
+        return asyncio.shield(lookup)
+    
+    def resolve_balance(self, account_number):
+        lookup = self.balance_lookups.pop(account_number)
+        lookup.set_result(self.service.execute_operation("check_balance", {"account_number": account_number}))
+    
+    def flush_writes(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        writes = self.pending_writes
+        self.pending_writes = []
+        if not writes:
+            return
+        
+        self.batches += 1
+        try:
+            result = self.service.execute_batch([(operation, params) for operation, params, future in writes])
+        except Exception as error:
+            for operation, params, future in writes:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for i, (operation, params, future) in enumerate(writes):
+            if not future.done():
+                future.set_result(result.to_dict(i))
+
+
+class atomic_counter:
+    
+    def __init__(self, start=1):
+        self.value = start
+        self.lock = threading.Lock()
+    
+    def next(self):
+        with self.lock:
+            value = self.value
+            self.value += 1
+        return value
+    
+    def reserve(self, count):
+        with self.lock:
+            value = self.value
+            self.value += count
+        return value
+
+
+transaction_ids = atomic_counter(1)
+
+
+def lock_for_account(account_number):
+    lock = account_locks.get(account_number)
+    if lock is None:
+        with account_locks_guard:
+            lock = account_locks.setdefault(account_number, threading.Lock())
+    return lock
+
+
+class account_lock_set:
+    
+    def __init__(self, account_numbers):
+        self.locks = [lock_for_account(number) for number in sorted(set(account_numbers) - {None})]
+    
+    def __enter__(self):
+        for lock in self.locks:
+            lock.acquire()
+        return self
+    
+    def __exit__(self, *exc_info):
+        for lock in reversed(self.locks):
+            lock.release()
+
+
+journal_record_layouts = [
+    struct.Struct("<QBBd16s16s" + "".join("q" if flags >> bit & 1 else "d" for bit in range(3)))
+    for flags in range(8)
+]
+journal_record = journal_record_layouts[0]
+journal_flags_offset = 9
+journal_account_size = 16
+journal_types = ["", "deposit", "withdrawal", "transfer_out", "transfer_in"]
+journal_type_codes = {name: code for code, name in enumerate(journal_types) if name}
+
+
+def journal_account(account_number):
+    encoded = account_number.encode()
+    if len(encoded) > journal_account_size:
+        raise ValueError(f"Número de cuenta demasiado largo para el diario: {account_number}")
+    return encoded
+
+
+def journal_int(value):
+    return type(value) is int and -2 ** 63 <= value < 2 ** 63
+
+
+class transaction_journal:
+    
+    def __init__(self, path, buffer_size=1 << 20):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, "ab", buffering=buffer_size)
+        self.count = os.path.getsize(path) // journal_record.size
+        self.mapping = None
+        self.mapped_count = 0
+        self.first_id = self.read_record(0)["id"] if self.count else None
+        self.last_id = self.read_record(self.count - 1)["id"] if self.count else 0
+    
+    def append(self, transaction):
+        counterparty = transaction.get("destination_account") or transaction.get("source_account") or ""
+        account = journal_account(transaction["account"])
+        counterparty = journal_account(counterparty)
+        type_code = journal_type_codes[transaction["type"]]
+        timestamp = transaction["date"].timestamp()
+        amount = transaction["amount"]
+        commission = transaction.get("commission", 0)
+        new_balance = transaction["new_balance"]
+        flags = journal_int(amount) | journal_int(commission) << 1 | journal_int(new_balance) << 2
+        layout = journal_record_layouts[flags]
+        with self.lock:
+            self.last_id += 1
+            transaction_id = transaction["id"] = self.last_id
+            self.file.write(layout.pack(
+                transaction_id, type_code, flags, timestamp, account, counterparty, amount, commission, new_balance
+            ))
+            if self.first_id is None:
+                self.first_id = transaction_id
+            self.count += 1
+        return transaction_id
+    
+    def append_many(self, transactions):
+        records = []
+        for transaction in transactions:
+            counterparty = transaction.get("destination_account") or transaction.get("source_account") or ""
+            amount = transaction["amount"]
+            commission = transaction.get("commission", 0)
+            new_balance = transaction["new_balance"]
+            flags = journal_int(amount) | journal_int(commission) << 1 | journal_int(new_balance) << 2
+            records.append((
+                journal_record_layouts[flags], journal_type_codes[transaction["type"]], flags,
+                transaction["date"].timestamp(), journal_account(transaction["account"]),
+                journal_account(counterparty), amount, commission, new_balance
+            ))
+        with self.lock:
+            first_id = self.last_id + 1
+            self.file.write(b"".join(
+                layout.pack(transaction_id, type_code, *fields)
+                for transaction_id, (layout, type_code, *fields) in enumerate(records, first_id)
+            ))
+            self.last_id += len(records)
+            if self.first_id is None and records:
+                self.first_id = first_id
+            self.count += len(records)
+        for transaction_id, transaction in enumerate(transactions, first_id):
+            transaction["id"] = transaction_id
+        return first_id
+    
+    def flush(self):
+        with self.lock:
+            self.file.flush()
+    
+    def close(self):
+        self.file.close()
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+    
+    def view(self):
+        if self.mapping is None or self.mapped_count < self.count:
+            self.flush()
+            if self.mapping is not None:
+                self.mapping.close()
+            with open(self.path, "rb") as file:
+                self.mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.mapped_count = self.count
+        return self.mapping
+    
+    def unpack(self, mapping, position):
+        offset = position * journal_record.size
+        return journal_record_layouts[mapping[offset + journal_flags_offset]].unpack_from(mapping, offset)
+    
+    def read_record(self, position):
+        id, type, flags, timestamp, account, counterparty, amount, commission, new_balance = \
+            self.unpack(self.view(), position)
+        transaction = {
+            "id": id,
+            "type": journal_types[type],
+            "account": account.rstrip(b"\0").decode(),
+            "amount": amount,
+            "new_balance": new_balance,
+            "date": datetime.fromtimestamp(timestamp)
+        }
+        if type == 3:
+            transaction["destination_account"] = counterparty.rstrip(b"\0").decode()
+            transaction["commission"] = commission
+        elif type == 4:
+            transaction["source_account"] = counterparty.rstrip(b"\0").decode()
+        return transaction
+    
+    def get(self, transaction_id):
+        if self.first_id is None:
+            return None
+        position = transaction_id - self.first_id
+        if 0 <= position < self.count:
+            return self.read_record(position)
+        return None
+    
+    def __len__(self):
+        return self.count
+    
+    def __iter__(self):
+        for position in range(self.count):
+            yield self.read_record(position)
+    
+    def replay(self, accounts):
+        if self.count == 0:
+            return 0
+        today = datetime.now().date()
+        mapping = self.view()
+        replayed = 0
+        for position in range(self.count):
+            id, type, flags, timestamp, account, counterparty, amount, commission, new_balance = \
+                self.unpack(mapping, position)
+            account_number = account.rstrip(b"\0").decode()
+            if account_number not in accounts:
+                continue
+            account = accounts[account_number]
+            account["balance"] = new_balance
+            account["transactions"].append(id)
+            if type == 2 and datetime.fromtimestamp(timestamp).date() == today:
+                if account.get("withdrawals_date") != today:
+                    account["withdrawals_date"] = today
+                    account["withdrawals_today"] = 0
+                account["withdrawals_today"] += amount
+            replayed += 1
+        return replayed
+
+
+class batch_result:
+    
+    def __init__(self, kinds):
+        self.kinds = kinds
+        self.codes = array("b", bytes(len(kinds)))
+        self.values = [0] * len(kinds)
+    
+    def __len__(self):
+        return len(self.codes)
+    
+    def succeeded(self):
+        return self.codes.count(0)
+    
+    def to_dict(self, i):
+        if self.codes[i]:
+            return {"success": False, "error": batch_errors[self.codes[i]]}
+        if self.kinds[i] == 3:
+            return {"success": True, "commission": self.values[i]}
+        return {"success": True, "new_balance": self.values[i]}
+
+
+def project_interest(balances, rates, months):
+    if np is not None:
+        balances = np.asarray(balances, dtype=np.float64)
+        rates = np.asarray(rates, dtype=np.float64)
+        months = np.maximum(np.asarray(months, dtype=np.float64), 0)
+        return balances * np.power(1 + rates / 12, months)
+    
+    count = len(balances)
+    if isinstance(rates, (int, float)):
+        rates = [rates] * count
+    if isinstance(months, (int, float)):
+        months = [months] * count
+    return array("d", [
+        balance * (1 + rate / 12) ** max(month, 0)
+        for balance, rate, month in zip(balances, rates, months)
+    ])
+
+
+def project_accounts_interest(accounts, months):
+    numbers = list(accounts)
+    balances = [accounts[number]["balance"] for number in numbers]
+    rates = [accounts[number].get("interest", 0) for number in numbers]
+    return dict(zip(numbers, project_interest(balances, rates, months)))
 
 
 def calculate_savings_interest(balance, months):
-    monthly_interest = 0.02 / 12
-    for i in range(months):
-        interest = balance * monthly_interest
-        balance += interest
-    return balance
+    return float(project_interest([balance], account_interest_rates["savings"], months)[0])
 
 
 def calculate_checking_interest(balance, months):
-    monthly_interest = 0.001 / 12
-    for i in range(months):
-        interest = balance * monthly_interest
-        balance += interest
-    return balance
+    return float(project_interest([balance], account_interest_rates["checking"], months)[0])
 
 
 def calculate_business_interest(balance, months):
-    monthly_interest = 0.005 / 12
-    for i in range(months):
-        interest = balance * monthly_interest
-        balance += interest
-    return balance
+    return float(project_interest([balance], account_interest_rates["business"], months)[0])
+
+
+def benchmark_interest_projection(accounts=1000000, months=360):
+    balances = [1000.0 + i % 5000 for i in range(accounts)]
+    rates = [(0.02, 0.001, 0.005)[i % 3] for i in range(accounts)]
+    
+    start = time.perf_counter()
+    for balance, rate in zip(balances, rates):
+        monthly_interest = rate / 12
+        for i in range(months):
+            balance += balance * monthly_interest
+    loop_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    project_interest(balances, rates, months)
+    engine_elapsed = time.perf_counter() - start
+    
+    print(f"Bucle mensual: {loop_elapsed:.2f} s, motor vectorizado: {engine_elapsed:.2f} s")
+    return loop_elapsed, engine_elapsed
 
 
 def validate_account_number(number):
@@ -283,28 +870,229 @@ def validate_cvv(cvv):
     return True
 
 
+field_patterns = {
+    "account_number": re.compile(r"[0-9]{10}"),
+    "card_number": re.compile(r"[0-9]{16}"),
+    "cvv": re.compile(r"[0-9]{3}")
+}
+luhn_doubled = [0, 2, 4, 6, 8, 1, 3, 5, 7, 9]
+luhn_table = bytes.maketrans(b"0123456789", bytes(luhn_doubled))
+digit_values = bytes.maketrans(b"0123456789", bytes(range(10)))
+
+
+def luhn_checksum_valid(number):
+    digits = number.encode("ascii")
+    return (sum(digits[-1::-2].translate(digit_values)) + sum(digits[-2::-2].translate(luhn_table))) % 10 == 0
+
+
+def validate_bulk(values, field, luhn=False):
+    if field not in field_patterns:
+        raise ValueError(f"Campo desconocido: {field}")
+    match = field_patterns[field].fullmatch
+    check_luhn = luhn and field == "card_number"
+    
+    if np is not None:
+        mask = np.fromiter(
+            (isinstance(value, str) and match(value) is not None for value in values),
+            dtype=bool,
+            count=len(values)
+        )
+        if check_luhn and mask.any():
+            rows = np.flatnonzero(mask)
+            digits = np.frombuffer("".join(values[i] for i in rows).encode("ascii"), dtype=np.uint8)
+            digits = digits.reshape(len(rows), 16).astype(np.int64) - 48
+            digits[:, 0::2] = np.take(luhn_doubled, digits[:, 0::2])
+            mask[rows] = digits.sum(axis=1) % 10 == 0
+        return mask
+    
+    try:
+        mask = array("b", map(bool, map(match, values)))
+    except TypeError:
+        mask = array("b", [isinstance(value, str) and match(value) is not None for value in values])
+    if check_luhn:
+        for i, value in enumerate(values):
+            if mask[i] and not luhn_checksum_valid(value):
+                mask[i] = 0
+    return mask
+
+
+def benchmark_bulk_validation(rows=10000000):
+    values = [f"{random.randrange(10 ** 16):016d}" for i in range(rows)]
+    
+    start = time.perf_counter()
+    [validate_card_number(value) for value in values]
+    single_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    validate_bulk(values, "card_number")
+    bulk_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    validate_bulk(values, "card_number", luhn=True)
+    luhn_elapsed = time.perf_counter() - start
+    
+    print(f"{rows} tarjetas: por llamada {single_elapsed:.2f} s, masivo {bulk_elapsed:.2f} s, "
+          f"masivo con Luhn {luhn_elapsed:.2f} s")
+    return single_elapsed, bulk_elapsed, luhn_elapsed
+
+
+class bounded_sink:
+    
+    def __init__(self, capacity=10000, policy="drop_oldest", path=None, consumer=None,
+                 flush_interval=1.0, batch_size=1000):
+        if policy not in ("drop_oldest", "drop_newest", "block"):
+            raise ValueError(f"Política desconocida: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self.path = path
+        self.consumer = consumer
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.buffer = deque(maxlen=capacity)
+        self.pending = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+        self.last_error = None
+        self.condition = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.flusher = None
+        self.stopped = False
+    
+    def put(self, item):
+        with self.condition:
+            if not (self.path or self.consumer):
+                if len(self.buffer) >= self.capacity:
+                    self.dropped += 1
+                    if self.policy == "drop_newest":
+                        return False
+                self.buffer.append(item)
+                return True
+            if self.pending >= self.capacity:
+                if self.policy == "drop_newest":
+                    self.dropped += 1
+                    return False
+                if self.policy == "block":
+                    self.start()
+                    self.condition.notify_all()
+                    while self.pending >= self.capacity and not self.stopped:
+                        self.condition.wait()
+                else:
+                    self.dropped += 1
+                    self.pending -= 1
+            self.buffer.append(item)
+            self.pending += 1
+            if self.pending >= self.batch_size:
+                self.condition.notify_all()
+        if self.flusher is None and (self.path or self.consumer):
+            self.start()
+        return True
+    
+    def flush(self):
+        with self.flush_lock:
+            with self.condition:
+                if not self.pending:
+                    return 0
+                batch = list(self.buffer)[-self.pending:]
+                self.pending = 0
+                self.condition.notify_all()
+            
+            try:
+                if self.path:
+                    with open(self.path, "a", encoding="utf-8") as file:
+                        file.writelines(json.dumps(item, default=str) + "\n" for item in batch)
+                if self.consumer:
+                    self.consumer(batch)
+            except Exception as error:
+                with self.condition:
+                    self.failed += len(batch)
+                    self.last_error = error
+                raise
+            
+            with self.condition:
+                self.flushed += len(batch)
+            return len(batch)
+    
+    def start(self):
+        with self.condition:
+            if self.flusher is not None and self.flusher.is_alive():
+                return
+            self.stopped = False
+            self.flusher = threading.Thread(target=self.run_flusher, daemon=True)
+            self.flusher.start()
+    
+    def run_flusher(self):
+        while True:
+            with self.condition:
+                if not self.stopped and self.pending < self.batch_size:
+                    self.condition.wait(self.flush_interval)
+                stopped = self.stopped
+            try:
+                self.flush()
+            except Exception:
+                pass
+            if stopped:
+                return
+    
+    def close(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+            flusher = self.flusher
+            self.flusher = None
+        if flusher is not None:
+            flusher.join()
+        else:
+            self.flush()
+    
+    def items(self):
+        with self.condition:
+            return list(self.buffer)
+    
+    def clear(self):
+        with self.condition:
+            self.buffer.clear()
+            self.pending = 0
+            self.condition.notify_all()
+    
+    def stats(self):
+        with self.condition:
+            return {
+                "buffered": len(self.buffer),
+                "pending": self.pending,
+                "dropped": self.dropped,
+                "flushed": self.flushed,
+                "failed": self.failed
+            }
+
+
 class notification_handler:
     _instance = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(notification_handler, cls).__new__(cls)
-            cls._instance.notifications = []
+            cls._instance.sink = bounded_sink()
             cls._instance.configuration = {}
         return cls._instance
     
+    def configure(self, **options):
+        self.sink.close()
+        self.configuration = options
+        self.sink = bounded_sink(**options)
+    
     def send(self, recipient, message):
-        self.notifications.append({
+        self.sink.put({
             "recipient": recipient,
             "message": message,
             "timestamp": datetime.now()
         })
     
     def get_all(self):
-        return self.notifications
+        return self.sink.items()
     
     def clear(self):
-        self.notifications = []
+        self.sink.clear()
 
 
 class log_handler:
@@ -313,17 +1101,198 @@ class log_handler:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(log_handler, cls).__new__(cls)
-            cls._instance.logs = []
+            cls._instance.sink = bounded_sink()
         return cls._instance
     
+    def configure(self, **options):
+        self.sink.close()
+        self.sink = bounded_sink(**options)
+    
     def log(self, message):
-        self.logs.append({
+        self.sink.put({
             "message": message,
             "timestamp": datetime.now()
         })
     
     def get_all(self):
-        return self.logs
+        return self.sink.items()
+
+
+def benchmark_withdrawal_latency(sizes=(1000, 10000, 100000, 1000000), withdrawals=1000):
+    results = {}
+    for size in sizes:
+        bank_accounts.clear()
+        global_transactions.clear()
+        transaction_index.clear()
+        service = banking_service()
+        service.execute_operation("create_account", {
+            "account_number": "0000000001",
+            "holder": "Benchmark",
+            "type": "business",
+            "initial_balance": 10 ** 9
+        })
+        for i in range(size):
+            service.execute_operation("deposit", {"account_number": "0000000001", "amount": 1})
+        
+        start = time.perf_counter()
+        for i in range(withdrawals):
+            service.execute_operation("withdraw", {"account_number": "0000000001", "amount": 1})
+        elapsed = time.perf_counter() - start
+        results[size] = elapsed / withdrawals * 1e6
+        print(f"{size:>10} transacciones: {results[size]:.2f} µs por retiro")
+    return results
+
+
+def benchmark_batch_settlement(rows=1000000, accounts=1000):
+    bank_accounts.clear()
+    global_transactions.clear()
+    transaction_index.clear()
+    service = banking_service()
+    for i in range(accounts):
+        service.execute_operation("create_account", {
+            "account_number": f"{i:010d}",
+            "holder": "Benchmark",
+            "type": "business",
+            "initial_balance": 10 ** 6
+        })
+    
+    operations = []
+    for i in range(rows):
+        account_number = f"{i % accounts:010d}"
+        if i % 3 == 0:
+            operations.append(("deposit", {"account_number": account_number, "amount": 10}))
+        elif i % 3 == 1:
+            operations.append(("withdraw", {"account_number": account_number, "amount": 5}))
+        else:
+            operations.append(("transfer", {
+                "source_account": account_number,
+                "destination_account": f"{(i + 1) % accounts:010d}",
+                "amount": 5
+            }))
+    
+    start = time.perf_counter()
+    result = service.execute_batch(operations)
+    elapsed = time.perf_counter() - start
+    print(f"{rows} operaciones en lote: {elapsed:.2f} s ({result.succeeded()} exitosas)")
+    return elapsed
+
+
+def benchmark_journal_append(records=1000000, path="benchmark_journal.bin"):
+    if os.path.exists(path):
+        os.remove(path)
+    journal = transaction_journal(path)
+    transaction = {
+        "type": "deposit",
+        "account": "0000000001",
+        "amount": 1,
+        "new_balance": 1,
+        "date": datetime.now()
+    }
+    
+    start = time.perf_counter()
+    for i in range(records):
+        journal.append(transaction)
+    journal.flush()
+    elapsed = time.perf_counter() - start
+    
+    journal.close()
+    
+    start = time.perf_counter()
+    journal = transaction_journal(path)
+    accounts = {"0000000001": {"balance": 0, "transactions": []}}
+    replayed = journal.replay(accounts)
+    restore_elapsed = time.perf_counter() - start
+    restored = replayed == records and accounts["0000000001"]["balance"] == 1
+    
+    print(f"{records} registros: {elapsed / records * 1e6:.2f} µs por registro, "
+          f"{os.path.getsize(path) / records:.0f} bytes por registro, "
+          f"reapertura y reproducción {restore_elapsed:.2f} s, estado correcto: {restored}")
+    journal.close()
+    os.remove(path)
+    return elapsed
+
+
+def benchmark_concurrent_transfers(threads=(1, 2, 4, 8), accounts=1000, transfers=20000):
+    results = {}
+    for workers in threads:
+        bank_accounts.clear()
+        global_transactions.clear()
+        transaction_index.clear()
+        service = banking_service(concurrent=True)
+        for i in range(accounts):
+            service.execute_operation("create_account", {
+                "account_number": f"{i:010d}",
+                "holder": "Benchmark",
+                "type": "business",
+                "initial_balance": 10000
+            })
+        total_before = sum(account["balance"] for account in bank_accounts.values())
+        
+        operations = []
+        for i in range(transfers):
+            source, destination = random.sample(range(accounts), 2)
+            operations.append(("transfer", {
+                "source_account": f"{source:010d}",
+                "destination_account": f"{destination:010d}",
+                "amount": random.randint(1, 500)
+            }))
+        
+        start = time.perf_counter()
+        outcomes = service.execute_parallel(operations, workers)
+        elapsed = time.perf_counter() - start
+        
+        commissions = sum(outcome["commission"] for outcome in outcomes if outcome["success"])
+        total_after = sum(account["balance"] for account in bank_accounts.values())
+        conserved = abs(total_before - total_after - commissions) < 1e-6 * total_before
+        ids = [transaction["id"] for transaction in global_transactions]
+        
+        results[workers] = transfers / elapsed
+        print(f"{workers} hilos: {results[workers]:.0f} transferencias/s, "
+              f"dinero conservado: {conserved}, ids únicos: {len(ids) == len(set(ids))}")
+    return results
+
+
+async def generate_async_load(service, clients=10000, requests_per_client=5, accounts=100):
+    latencies = []
+    
+    async def client(number):
+        for i in range(requests_per_client):
+            account_number = f"{(number + i) % accounts:010d}"
+            if i % 2 == 0:
+                operation, params = "check_balance", {"account_number": account_number}
+            else:
+                operation, params = "deposit", {"account_number": account_number, "amount": 1}
+            start = time.perf_counter()
+            await service.execute(operation, params)
+            latencies.append(time.perf_counter() - start)
+    
+    await asyncio.gather(*(client(number) for number in range(clients)))
+    return sorted(latencies)
+
+
+def benchmark_async_latency(clients=10000, requests_per_client=5, accounts=100):
+    bank_accounts.clear()
+    global_transactions.clear()
+    transaction_index.clear()
+    service = async_banking_service()
+    for i in range(accounts):
+        service.service.execute_operation("create_account", {
+            "account_number": f"{i:010d}",
+            "holder": "Benchmark",
+            "type": "business",
+            "initial_balance": 1000
+        })
+    
+    start = time.perf_counter()
+    latencies = asyncio.run(generate_async_load(service, clients, requests_per_client, accounts))
+    elapsed = time.perf_counter() - start
+    
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{clients} clientes: p50 {p50:.2f} ms, p99 {p99:.2f} ms, "
+          f"{len(latencies) / elapsed:.0f} peticiones/s, {service.batches} lotes, "
+          f"{service.coalesced} consultas agrupadas")
+    return p50, p99
 
 
 if __name__ == "__main__":
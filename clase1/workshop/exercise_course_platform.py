@@ -5,34 +5,152 @@ System to manage courses, students and evaluations.
 Analyze the code and identify the antipatterns present.
 """
 
+import asyncio
+import heapq
+import time
 import random
 import json
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from operator import eq
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 global_data = {
     "courses": {},
     "students": {},
     "teachers": {},
-    "evaluations": []
+    "evaluations": [],
+    "evaluation_index": {},
+    "answer_keys": {},
+    "student_numbers": {},
+    "course_numbers": {}
 }
 
 
+def reset_global_data():
+    for collection in global_data.values():
+        collection.clear()
+
+
+enrollment_discount_rates = {"advanced": 0.20, "intermediate": 0.10}
+
+level_thresholds = ((500, "expert"), (300, "advanced"), (150, "intermediate"))
+
+
+def level_for_points(points):
+    for threshold, level in level_thresholds:
+        if points >= threshold:
+            return level
+    return "novice"
+
+
+class atomic_sequence:
+    
+    def __init__(self, start=1):
+        self.value = start
+        self.lock = threading.Lock()
+    
+    def next(self):
+        with self.lock:
+            value = self.value
+            self.value += 1
+        return value
+
+
+class certificate_queue:
+    
+    def __init__(self, issue, workers=2):
+        self.issue = issue
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="certificates")
+        self.pending = set()
+        self.lock = threading.Lock()
+    
+    def submit(self, student_id, course_id, callback=None):
+        future = self.executor.submit(self.issue, student_id, course_id)
+        with self.lock:
+            self.pending.add(future)
+        future.add_done_callback(self.job_done)
+        if callback is not None:
+            future.add_done_callback(lambda done: callback(done.result()))
+        return future
+    
+    async def issue_async(self, student_id, course_id):
+        return await asyncio.wrap_future(self.submit(student_id, course_id))
+    
+    def job_done(self, future):
+        with self.lock:
+            self.pending.discard(future)
+    
+    def pending_count(self):
+        with self.lock:
+            return len(self.pending)
+    
+    def drain(self, timeout=None):
+        with self.lock:
+            pending = list(self.pending)
+        return wait(pending, timeout=timeout)
+    
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+class local_payment_gateway:
+    
+    def __init__(self, declined=(), latency=0):
+        self.declined = set(declined)
+        self.latency = latency
+        self.payments = []
+    
+    def charge(self, student_id, amount):
+        return self.charge_batch([(student_id, amount)])[0]
+    
+    def charge_batch(self, charges):
+        if self.latency:
+            time.sleep(self.latency)
+        now = datetime.now()
+        approved = []
+        for student_id, amount in charges:
+            accepted = student_id not in self.declined
+            self.payments.append({
+                "student_id": student_id,
+                "amount": amount,
+                "date": now,
+                "status": "completed" if accepted else "declined"
+            })
+            approved.append(accepted)
+        return approved
+
+
 class course_platform:
     
-    def __init__(self):
+    def __init__(self, payment_gateway=None, certificate_workers=0, certificate_renderer=None, sessions=None):
         self.courses = global_data["courses"]
         self.students = global_data["students"]
         self.teachers = global_data["teachers"]
         self.evaluations = global_data["evaluations"]
+        self.evaluation_index = global_data["evaluation_index"]
+        self.student_numbers = global_data["student_numbers"]
+        self.course_numbers = global_data["course_numbers"]
+        self.answer_keys = global_data["answer_keys"]
         self.enrollments = {}
         self.grades = {}
         self.certificates = []
-        self.payments = []
+        self.certificate_ids = atomic_sequence()
+        self.certificate_renderer = certificate_renderer
+        self.certificate_queue = certificate_queue(self.generate_certificate, certificate_workers) if certificate_workers else None
+        self.payment_gateway = payment_gateway if payment_gateway is not None else local_payment_gateway()
+        self.payments = getattr(self.payment_gateway, "payments", [])
         self.comments = []
         self.messages = []
         self.notifications = []
-        self.sessions = {}
+        self.sessions = sessions if sessions is not None else global_sessions
         self.resources = {}
         self.assignments = []
         self.forums = []
@@ -53,7 +171,7 @@ class course_platform:
                                 "price": data.get("price", 0),
                                 "category": data.get("category", "general"),
                                 "level": data.get("level", "beginner"),
-                                "students": [],
+                                "students": set(),
                                 "resources": [],
                                 "evaluations": [],
                                 "status": "active",
@@ -111,7 +229,7 @@ class course_platform:
                         self.students[data["id"]] = {
                             "name": data["name"],
                             "email": data["email"],
-                            "courses": [],
+                            "courses": set(),
                             "grades": {},
                             "certificates": [],
                             "registration_date": datetime.now(),
@@ -139,20 +257,14 @@ class course_platform:
                         if course_id not in student["courses"]:
                             price = course["price"]
                             
-                            if student["level"] == "advanced":
-                                discount = price * 0.20
-                            elif student["level"] == "intermediate":
-                                discount = price * 0.10
-                            else:
-                                discount = 0
-                            
+                            discount = price * enrollment_discount_rates.get(student["level"], 0)
                             final_price = price - discount
                             
                             if final_price == 0 or self.process_payment(student_id, final_price):
-                                student["courses"].append(course_id)
-                                course["students"].append(student_id)
+                                student["courses"].add(course_id)
+                                course["students"].add(student_id)
                                 
-                                self.enrollments[f"{student_id}_{course_id}"] = {
+                                self.enrollments[self.enrollment_key(student_id, course_id)] = {
                                     "date": datetime.now(),
                                     "progress": 0,
                                     "last_activity": datetime.now()
@@ -182,7 +294,7 @@ class course_platform:
                     if course_id in self.courses:
                         evaluation_id = len(self.evaluations) + 1
                         
-                        self.evaluations.append({
+                        evaluation = {
                             "id": evaluation_id,
                             "course_id": course_id,
                             "title": title,
@@ -190,7 +302,10 @@ class course_platform:
                             "allowed_attempts": data.get("allowed_attempts", 3),
                             "time_limit": data.get("time_limit", 60),
                             "creation_date": datetime.now()
-                        })
+                        }
+                        self.evaluations.append(evaluation)
+                        self.evaluation_index[evaluation_id] = evaluation
+                        self.answer_keys[evaluation_id] = tuple(question["correct_answer"] for question in questions)
                         
                         self.courses[course_id]["evaluations"].append(evaluation_id)
                         
@@ -208,41 +323,17 @@ class course_platform:
                 answers = data.get("answers", [])
                 
                 if student_id and evaluation_id and answers:
-                    evaluation = None
-                    for eval in self.evaluations:
-                        if eval["id"] == evaluation_id:
-                            evaluation = eval
-                            break
+                    evaluation = self.evaluation_index.get(evaluation_id)
                     
                     if evaluation:
                         course_id = evaluation["course_id"]
                         if course_id in self.students[student_id]["courses"]:
-                            score = 0
-                            total = len(evaluation["questions"])
-                            
-                            for i, answer in enumerate(answers):
-                                if i < total and answer == evaluation["questions"][i]["correct_answer"]:
-                                    score += 1
+                            answer_key = self.answer_keys[evaluation_id]
+                            score = sum(map(eq, answers, answer_key))
+                            total = len(answer_key)
                             
                             grade = (score / total) * 100
-                            
-                            grade_key = f"{student_id}_{evaluation_id}"
-                            self.grades[grade_key] = {
-                                "grade": grade,
-                                "date": datetime.now(),
-                                "passed": grade >= 70
-                            }
-                            
-                            if grade >= 70:
-                                self.students[student_id]["points"] += 50
-                                self.update_student_level(student_id)
-                                
-                                if self.courses[course_id]["certificate"]:
-                                    self.generate_certificate(student_id, course_id)
-                            
-                            result["success"] = True
-                            result["message"] = f"Calificación: {grade}%"
-                            result["passed"] = grade >= 70
+                            self.record_grade(student_id, evaluation_id, course_id, grade, result)
                         else:
                             result["message"] = "Estudiante no inscrito"
                     else:
@@ -252,39 +343,186 @@ class course_platform:
         
         return result
     
-    def process_payment(self, student_id, amount):
-        self.payments.append({
-            "student_id": student_id,
-            "amount": amount,
+    def enrollment_key(self, student_id, course_id):
+        student_number = self.student_numbers.get(student_id)
+        if student_number is None:
+            student_number = self.student_numbers.setdefault(student_id, len(self.student_numbers))
+        course_number = self.course_numbers.get(course_id)
+        if course_number is None:
+            course_number = self.course_numbers.setdefault(course_id, len(self.course_numbers))
+        return (student_number, course_number)
+    
+    def is_enrolled(self, student_id, course_id):
+        student = self.students.get(student_id)
+        return student is not None and course_id in student["courses"]
+    
+    def get_enrollment(self, student_id, course_id):
+        if not self.is_enrolled(student_id, course_id):
+            return None
+        return self.enrollments.get(self.enrollment_key(student_id, course_id))
+    
+    def courses_of(self, student_id):
+        student = self.students.get(student_id)
+        return iter(student["courses"]) if student is not None else iter(())
+    
+    def students_of(self, course_id):
+        course = self.courses.get(course_id)
+        return iter(course["students"]) if course is not None else iter(())
+    
+    def record_grade(self, student_id, evaluation_id, course_id, grade, result):
+        grade_key = f"{student_id}_{evaluation_id}"
+        self.grades[grade_key] = {
+            "grade": grade,
             "date": datetime.now(),
-            "status": "completed"
-        })
-        return True
+            "passed": grade >= 70
+        }
+        
+        if grade >= 70:
+            self.students[student_id]["points"] += 50
+            self.update_student_level(student_id)
+            
+            if self.courses[course_id]["certificate"]:
+                if self.certificate_queue is not None:
+                    result["certificate"] = self.certificate_queue.submit(student_id, course_id)
+                else:
+                    self.generate_certificate(student_id, course_id)
+        
+        result["success"] = True
+        result["message"] = f"Calificación: {grade}%"
+        result["passed"] = grade >= 70
+        return result
     
-    def update_student_level(self, student_id):
-        student = self.students[student_id]
-        points = student["points"]
+    def score_submissions(self, evaluation_id, submissions):
+        answer_key = self.answer_keys[evaluation_id]
+        total = len(answer_key)
         
-        if points >= 500:
-            student["level"] = "expert"
-        elif points >= 300:
-            student["level"] = "advanced"
-        elif points >= 150:
-            student["level"] = "intermediate"
+        if np is not None and isinstance(submissions, np.ndarray) and submissions.ndim == 2 \
+                and submissions.dtype != object:
+            columns = min(total, submissions.shape[1])
+            key = np.asarray(answer_key[:columns])
+            return ((submissions[:, :columns] == key).sum(axis=1) / total * 100).tolist()
+        
+        return [sum(map(eq, answers, answer_key)) / total * 100 for answers in submissions]
+    
+    def grade_batch(self, evaluation_id, student_ids, submissions):
+        evaluation = self.evaluation_index.get(evaluation_id)
+        if evaluation is None:
+            return [{"success": False, "message": "Evaluación no encontrada"} for student_id in student_ids]
+        
+        course_id = evaluation["course_id"]
+        results = [{"success": False, "message": ""} for student_id in student_ids]
+        accepted = []
+        for row, (student_id, answers) in enumerate(zip(student_ids, submissions)):
+            if not student_id or answers is None or len(answers) == 0:
+                results[row]["message"] = "Datos incompletos"
+            elif not self.is_enrolled(student_id, course_id):
+                results[row]["message"] = "Estudiante no inscrito"
+            else:
+                accepted.append(row)
+        
+        if np is not None and isinstance(submissions, np.ndarray):
+            accepted_submissions = submissions[accepted]
         else:
-            student["level"] = "novice"
+            accepted_submissions = [submissions[row] for row in accepted]
+        grades = self.score_submissions(evaluation_id, accepted_submissions)
+        for row, grade in zip(accepted, grades):
+            self.record_grade(student_ids[row], evaluation_id, course_id, grade, results[row])
+        return results
+    
+    def enroll_bulk(self, pairs):
+        results = [{"success": False, "message": ""} for pair in pairs]
+        waves = []
+        depth = {}
+        for row, (student_id, course_id) in enumerate(pairs):
+            if not student_id or not course_id:
+                results[row]["message"] = "Datos incompletos"
+            elif student_id not in self.students or course_id not in self.courses:
+                results[row]["message"] = "Estudiante o curso no encontrado"
+            else:
+                wave = depth.get(student_id, 0)
+                depth[student_id] = wave + 1
+                if wave == len(waves):
+                    waves.append([])
+                waves[wave].append(row)
+        
+        for rows in waves:
+            self.enroll_wave(pairs, rows, results)
+        return results
+    
+    def enroll_wave(self, pairs, rows, results):
+        students = self.students
+        courses = self.courses
+        charges = []
+        charged = []
+        accepted = []
+        
+        for row in rows:
+            student_id, course_id = pairs[row]
+            student = students[student_id]
+            if course_id in student["courses"]:
+                results[row]["message"] = "Ya inscrito en el curso"
+                continue
+            price = courses[course_id]["price"]
+            final_price = price - price * enrollment_discount_rates.get(student["level"], 0)
+            if final_price == 0:
+                accepted.append(row)
+            else:
+                charges.append((student_id, final_price))
+                charged.append(row)
+        
+        if charges:
+            try:
+                approved = list(self.payment_gateway.charge_batch(charges))
+            except Exception:
+                approved = []
+            if len(approved) != len(charges):
+                approved = [False] * len(charges)
+            for row, paid in zip(charged, approved):
+                if paid:
+                    accepted.append(row)
+                else:
+                    results[row]["message"] = "Error en el pago"
+            accepted.sort()
+        
+        enrollments = self.enrollments
+        enrollment_key = self.enrollment_key
+        now = datetime.now()
+        for row in accepted:
+            student_id, course_id = pairs[row]
+            student = students[student_id]
+            student["courses"].add(course_id)
+            courses[course_id]["students"].add(student_id)
+            enrollments[enrollment_key(student_id, course_id)] = {
+                "date": now,
+                "progress": 0,
+                "last_activity": now
+            }
+            student["points"] += 10
+            self.update_student_level(student_id)
+            results[row]["success"] = True
+            results[row]["message"] = "Inscripción exitosa"
+    
+    def process_payment(self, student_id, amount):
+        return self.payment_gateway.charge(student_id, amount)
+    
+    def update_student_level(self, student_id):
+        student = self.students[student_id]
+        student["level"] = level_for_points(student["points"])
     
     def generate_certificate(self, student_id, course_id):
+        certificate_id = self.certificate_ids.next()
         certificate = {
-            "id": len(self.certificates) + 1,
+            "id": certificate_id,
             "student_id": student_id,
             "course_id": course_id,
             "issue_date": datetime.now(),
-            "verification_code": f"CERT-{student_id}-{course_id}-{random.randint(1000, 9999)}"
+            "verification_code": f"CERT-{student_id}-{course_id}-{certificate_id}-{secrets.token_hex(4).upper()}"
         }
+        if self.certificate_renderer is not None:
+            certificate["document"] = self.certificate_renderer(certificate)
         
         self.certificates.append(certificate)
-        self.students[student_id]["certificates"].append(certificate["id"])
+        self.students[student_id]["certificates"].append(certificate_id)
         
         return certificate
 
@@ -345,26 +583,107 @@ def calculate_quantity_discount_price(price, quantity):
         return price
 
 
+class session_record:
+    __slots__ = ("user_id", "start", "last_activity", "expires")
+    
+    def __init__(self, user_id, expires):
+        self.user_id = user_id
+        self.start = datetime.now()
+        self.last_activity = self.start
+        self.expires = expires
+
+
+class session_shard:
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.deadlines = []
+        self.expired = 0
+    
+    def expire(self, now):
+        deadlines = self.deadlines
+        sessions = self.sessions
+        while deadlines and deadlines[0][0] <= now:
+            deadline, session_id = heapq.heappop(deadlines)
+            session = sessions.get(session_id)
+            if session is None:
+                continue
+            if session.expires > now:
+                heapq.heappush(deadlines, (session.expires, session_id))
+            else:
+                del sessions[session_id]
+                self.expired += 1
+
+
 class session_manager:
-    _instance = None
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(session_manager, cls).__new__(cls)
-            cls._instance.active_sessions = {}
-        return cls._instance
+    def __init__(self, ttl=1800, shards=16, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.shards = [session_shard() for shard in range(shards)]
+        self.session_ids = atomic_sequence()
+    
+    def shard_for(self, session_id):
+        return self.shards[hash(session_id) % len(self.shards)]
     
     def create_session(self, user_id):
-        session_id = f"SES-{user_id}-{random.randint(10000, 99999)}"
-        self.active_sessions[session_id] = {
-            "user_id": user_id,
-            "start": datetime.now(),
-            "last_activity": datetime.now()
-        }
+        session_id = f"SES-{self.session_ids.next():x}-{secrets.token_urlsafe(12)}"
+        now = self.clock()
+        session = session_record(user_id, now + self.ttl)
+        shard = self.shard_for(session_id)
+        with shard.lock:
+            shard.expire(now)
+            shard.sessions[session_id] = session
+            heapq.heappush(shard.deadlines, (session.expires, session_id))
         return session_id
     
     def validate_session(self, session_id):
-        return session_id in self.active_sessions
+        now = self.clock()
+        shard = self.shard_for(session_id)
+        with shard.lock:
+            shard.expire(now)
+            session = shard.sessions.get(session_id)
+            if session is None:
+                return False
+            session.expires = now + self.ttl
+            session.last_activity = datetime.now()
+            return True
+    
+    def get_session(self, session_id):
+        shard = self.shard_for(session_id)
+        with shard.lock:
+            session = shard.sessions.get(session_id)
+            if session is None or session.expires <= self.clock():
+                return None
+            return {
+                "user_id": session.user_id,
+                "start": session.start,
+                "last_activity": session.last_activity
+            }
+    
+    def end_session(self, session_id):
+        shard = self.shard_for(session_id)
+        with shard.lock:
+            return shard.sessions.pop(session_id, None) is not None
+    
+    def expire_sessions(self):
+        now = self.clock()
+        for shard in self.shards:
+            with shard.lock:
+                shard.expire(now)
+    
+    def stats(self):
+        self.expire_sessions()
+        active = expired = 0
+        for shard in self.shards:
+            with shard.lock:
+                active += len(shard.sessions)
+                expired += shard.expired
+        return {"active": active, "expired": expired}
+
+
+global_sessions = session_manager()
 
 
 class cache_handler:
@@ -388,6 +707,161 @@ class cache_handler:
         return None
 
 
+def benchmark_grading(students=20000, questions=50):
+    reset_global_data()
+    platform = course_platform()
+    platform.teachers["BENCH-T"] = {"name": "Profesor"}
+    platform.manage_entity("course", "create", {"id": "BENCH-C", "name": "Curso", "teacher_id": "BENCH-T", "price": 0})
+    for i in range(students):
+        platform.manage_entity("student", "create", {"id": f"BENCH-S{i}", "name": f"Estudiante {i}", "email": f"s{i}@email.com"})
+        platform.manage_entity("student", "enroll", {"student_id": f"BENCH-S{i}", "course_id": "BENCH-C"})
+    evaluation_id = platform.manage_entity("evaluation", "create", {
+        "course_id": "BENCH-C",
+        "title": "Examen",
+        "questions": [{"correct_answer": random.choice("abcd")} for q in range(questions)]
+    })["evaluation_id"]
+    
+    student_ids = [f"BENCH-S{i}" for i in range(students)]
+    submissions = [[random.choice("abcd") for q in range(questions)] for i in range(students)]
+    
+    start = time.perf_counter()
+    for student_id, answers in zip(student_ids, submissions):
+        platform.manage_entity("evaluation", "grade", {
+            "student_id": student_id,
+            "evaluation_id": evaluation_id,
+            "answers": answers
+        })
+    single_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    platform.grade_batch(evaluation_id, student_ids, submissions)
+    batch_elapsed = time.perf_counter() - start
+    
+    print(f"{students} entregas: una a una {students / single_elapsed:.0f}/s, en lote {students / batch_elapsed:.0f}/s")
+    
+    if np is not None:
+        matrix = np.array(submissions)
+        start = time.perf_counter()
+        platform.grade_batch(evaluation_id, student_ids, matrix)
+        print(f"en lote con matriz numpy {students / (time.perf_counter() - start):.0f}/s")
+    return single_elapsed, batch_elapsed
+
+
+def benchmark_enrollment(students=1000000, checks=100000):
+    reset_global_data()
+    platform = course_platform()
+    platform.teachers["BENCH-T"] = {"name": "Profesor"}
+    platform.manage_entity("course", "create", {"id": "BENCH-C", "name": "MOOC", "teacher_id": "BENCH-T", "price": 0})
+    
+    start = time.perf_counter()
+    for i in range(students):
+        platform.manage_entity("student", "create", {"id": f"BENCH-S{i}", "name": f"Estudiante {i}", "email": f"s{i}@email.com"})
+        platform.manage_entity("student", "enroll", {"student_id": f"BENCH-S{i}", "course_id": "BENCH-C"})
+    enroll_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for i in range(checks):
+        student_id = f"BENCH-S{(i * 7919) % students}"
+        platform.is_enrolled(student_id, "BENCH-C")
+        student_id in platform.courses["BENCH-C"]["students"]
+    check_elapsed = time.perf_counter() - start
+    
+    print(f"{students} inscripciones: {students / enroll_elapsed:.0f}/s, "
+          f"{checks / check_elapsed:.0f} comprobaciones de pertenencia/s")
+    return enroll_elapsed, check_elapsed
+
+
+def benchmark_bulk_enrollment(students=200000, price=150, latency=0.0001):
+    pairs = [(f"BENCH-S{i}", "BENCH-C") for i in range(students)]
+    timings = []
+    for bulk in (False, True):
+        reset_global_data()
+        platform = course_platform(local_payment_gateway(latency=latency))
+        platform.teachers["BENCH-T"] = {"name": "Profesor"}
+        platform.manage_entity("course", "create", {"id": "BENCH-C", "name": "Cohorte", "teacher_id": "BENCH-T", "price": price})
+        for i in range(students):
+            platform.manage_entity("student", "create", {"id": f"BENCH-S{i}", "name": f"Estudiante {i}", "email": f"s{i}@email.com"})
+        
+        start = time.perf_counter()
+        if bulk:
+            platform.enroll_bulk(pairs)
+        else:
+            for student_id, course_id in pairs:
+                platform.manage_entity("student", "enroll", {"student_id": student_id, "course_id": course_id})
+        timings.append(time.perf_counter() - start)
+    
+    single_elapsed, bulk_elapsed = timings
+    print(f"{students} inscripciones: una a una {students / single_elapsed:.0f}/s, en lote {students / bulk_elapsed:.0f}/s")
+    return single_elapsed, bulk_elapsed
+
+
+def benchmark_certificate_latency(students=2000, render_cost=0.002, workers=4):
+    percentiles = []
+    for queued in (False, True):
+        reset_global_data()
+        platform = course_platform(
+            certificate_workers=workers if queued else 0,
+            certificate_renderer=lambda certificate: time.sleep(render_cost)
+        )
+        platform.teachers["BENCH-T"] = {"name": "Profesor"}
+        platform.manage_entity("course", "create", {"id": "BENCH-C", "name": "Premium", "teacher_id": "BENCH-T", "price": 0})
+        platform.manage_entity("course", "update", {"id": "BENCH-C", "price": 150})
+        evaluation_id = platform.manage_entity("evaluation", "create", {
+            "course_id": "BENCH-C",
+            "title": "Final",
+            "questions": [{"correct_answer": "a"} for q in range(10)]
+        })["evaluation_id"]
+        pairs = [(f"BENCH-S{i}", "BENCH-C") for i in range(students)]
+        for student_id, course_id in pairs:
+            platform.manage_entity("student", "create", {"id": student_id, "name": "Estudiante", "email": "s@email.com"})
+        platform.enroll_bulk(pairs)
+        
+        latencies = []
+        for student_id, course_id in pairs:
+            start = time.perf_counter()
+            platform.manage_entity("evaluation", "grade", {
+                "student_id": student_id,
+                "evaluation_id": evaluation_id,
+                "answers": ["a"] * 10
+            })
+            latencies.append(time.perf_counter() - start)
+        
+        if platform.certificate_queue is not None:
+            platform.certificate_queue.drain()
+            platform.certificate_queue.shutdown()
+        latencies.sort()
+        percentiles.append(latencies[int(len(latencies) * 0.99)] * 1000)
+    
+    inline_p99, queued_p99 = percentiles
+    print(f"{students} calificaciones con certificado: p99 en línea {inline_p99:.2f} ms, "
+          f"p99 con cola {queued_p99:.2f} ms")
+    return inline_p99, queued_p99
+
+
+def benchmark_sessions(logins=1000000, ttl=1800, day=86400):
+    clock = [0.0]
+    sessions = session_manager(ttl=ttl, clock=lambda: clock[0])
+    step = day / logins
+    recent = []
+    peak = 0
+    
+    start = time.perf_counter()
+    for i in range(logins):
+        clock[0] += step
+        recent.append(sessions.create_session(f"U{i % 50000}"))
+        if len(recent) > 1000:
+            recent = recent[-100:]
+        sessions.validate_session(recent[(i * 7919) % len(recent)])
+        if i % 10000 == 0:
+            peak = max(peak, sessions.stats()["active"])
+    elapsed = time.perf_counter() - start
+    
+    stats = sessions.stats()
+    print(f"{logins} inicios de sesión: {logins / elapsed:.0f}/s, {stats['active']} activas "
+          f"(máximo {peak}), {stats['expired']} expiradas")
+    return stats
+
+
 if __name__ == "__main__":
     platform = course_platform()
     
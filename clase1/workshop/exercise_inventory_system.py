@@ -5,54 +5,1425 @@ This system handles product inventory, orders and customers.
 Your task is to identify the antipatterns present in this code.
 """
 
+import os
+import re
+import sys
+import csv
 import json
+import mmap
+import struct
+import time
 import datetime
 import random
+import threading
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque, namedtuple
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter, mul, sub
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-global_products = {}
-global_customers = {}
+
+product_fields = ("name", "price", "stock", "category", "supplier")
+
+
+class code_table:
+    
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+    
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class product_record:
+    __slots__ = ("store", "row")
+    
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+    
+    def __getitem__(self, key):
+        return self.store.get_field(self.row, key)
+    
+    def __setitem__(self, key, value):
+        self.store.set_field(self.row, key, value)
+    
+    def get(self, key, default=None):
+        return self[key] if key in product_fields else default
+    
+    def keys(self):
+        return product_fields
+    
+    def __iter__(self):
+        return iter(product_fields)
+    
+    def __eq__(self, other):
+        return dict(self) == dict(other)
+    
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def stock_value(value):
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise ValueError(f"Stock inválido: {value!r}")
+
+
+class columnar_product_store:
+    
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+    
+    def clear(self):
+        self.ids = []
+        self.rows = {}
+        self.names = []
+        self.prices = array("d")
+        self.stocks = array("q")
+        self.category_codes = array("I")
+        self.supplier_codes = array("I")
+        self.categories = code_table()
+        self.suppliers = code_table()
+        self.mapping = None
+        self.pending = None
+    
+    def __getattr__(self, name):
+        if name not in ("ids", "names", "rows"):
+            raise AttributeError(name)
+        self.realize()
+        return self.__dict__[name]
+    
+    def attach(self, mapping, ids, names, prices, stocks, categories, category_codes, suppliers, supplier_codes):
+        with self.lock:
+            self.clear()
+            for name in ("ids", "names", "rows"):
+                del self.__dict__[name]
+            self.mapping = mapping
+            self.prices = prices
+            self.stocks = stocks
+            self.category_codes = category_codes
+            self.supplier_codes = supplier_codes
+            self.categories = categories
+            self.suppliers = suppliers
+            self.pending = (ids, names, len(self.prices), [], {})
+    
+    def detach(self):
+        with self.lock:
+            if self.mapping is None:
+                return
+            for name, typecode in (("prices", "d"), ("stocks", "q"), ("category_codes", "I"), ("supplier_codes", "I")):
+                column = array(typecode)
+                column.frombytes(getattr(self, name).cast("B"))
+                setattr(self, name, column)
+            self.mapping = None
+    
+    def realize(self):
+        with self.lock:
+            if self.pending is None:
+                return
+            ids, names, count, appended, renamed = self.pending
+            ids = decode_strings(ids, count)
+            names = decode_strings(names, count)
+            for product_id, name in appended:
+                ids.append(product_id)
+                names.append(name)
+            for row, name in renamed.items():
+                names[row] = name
+            self.names = names
+            self.ids = ids
+            self.rows = dict(zip(ids, range(len(ids))))
+            self.pending = None
+    
+    def patch(self, rows, ids, names, prices, stocks, categories, category_codes, suppliers, supplier_codes):
+        with self.lock:
+            self.detach()
+            for position, row in sorted(enumerate(rows), key=itemgetter(1)):
+                category = self.categories.encode(categories.values[category_codes[position]])
+                supplier = self.suppliers.encode(suppliers.values[supplier_codes[position]])
+                if row < len(self.prices):
+                    self.prices[row] = prices[position]
+                    self.stocks[row] = stocks[position]
+                    self.category_codes[row] = category
+                    self.supplier_codes[row] = supplier
+                    if self.pending is None:
+                        self.names[row] = names[position]
+                    else:
+                        self.pending[4][row] = names[position]
+                elif row == len(self.prices):
+                    self.prices.append(prices[position])
+                    self.stocks.append(stocks[position])
+                    self.category_codes.append(category)
+                    self.supplier_codes.append(supplier)
+                    if self.pending is None:
+                        self.names.append(names[position])
+                        self.ids.append(ids[position])
+                        self.rows[ids[position]] = row
+                    else:
+                        self.pending[3].append((ids[position], names[position]))
+                else:
+                    raise ValueError(f"Fila de snapshot fuera de orden: {row}")
+    
+    def __len__(self):
+        return len(self.prices)
+    
+    def __contains__(self, product_id):
+        return product_id in self.rows
+    
+    def __iter__(self):
+        return iter(self.ids)
+    
+    def __getitem__(self, product_id):
+        return product_record(self, self.rows[product_id])
+    
+    def get(self, product_id, default=None):
+        row = self.rows.get(product_id)
+        return default if row is None else product_record(self, row)
+    
+    def __setitem__(self, product_id, product):
+        name = product["name"]
+        price = float(product["price"])
+        stock = stock_value(product["stock"])
+        category = product["category"]
+        supplier = product["supplier"]
+        
+        with self.lock:
+            if self.mapping is not None:
+                self.detach()
+            row = self.rows.get(product_id)
+            if row is not None:
+                self.names[row] = name
+                self.prices[row] = price
+                self.stocks[row] = stock
+                self.category_codes[row] = self.categories.encode(category)
+                self.supplier_codes[row] = self.suppliers.encode(supplier)
+                return
+            row = len(self.ids)
+            self.names.append(name)
+            self.prices.append(price)
+            self.stocks.append(stock)
+            self.category_codes.append(self.categories.encode(category))
+            self.supplier_codes.append(self.suppliers.encode(supplier))
+            self.ids.append(product_id)
+            self.rows[product_id] = row
+    
+    def get_field(self, row, key):
+        if key == "stock":
+            return self.stocks[row]
+        if key == "price":
+            return self.prices[row]
+        if key == "name":
+            return self.names[row]
+        if key == "category":
+            return self.categories.values[self.category_codes[row]]
+        if key == "supplier":
+            return self.suppliers.values[self.supplier_codes[row]]
+        raise KeyError(key)
+    
+    def set_field(self, row, key, value):
+        if self.mapping is not None:
+            self.detach()
+        if key == "stock":
+            self.stocks[row] = stock_value(value)
+        elif key == "price":
+            self.prices[row] = value
+        elif key == "name":
+            self.names[row] = value
+        elif key == "category":
+            with self.lock:
+                self.category_codes[row] = self.categories.encode(value)
+        elif key == "supplier":
+            with self.lock:
+                self.supplier_codes[row] = self.suppliers.encode(value)
+        else:
+            raise KeyError(key)
+    
+    def keys(self):
+        return list(self.ids)
+    
+    def values(self):
+        return [product_record(self, row) for row in range(len(self.ids))]
+    
+    def items(self):
+        return [(product_id, product_record(self, row)) for row, product_id in enumerate(self.ids)]
+    
+    def inventory_value(self):
+        return sum(map(mul, self.prices, self.stocks))
+    
+    def discounts(self, customer_type, engine=None):
+        engine = engine or global_discount_engine
+        return engine.reprice(self.categories.values, self.category_codes, self.prices, customer_type)
+
+
+class product_slots:
+    __slots__ = product_fields
+    
+    def __init__(self, name, price, stock, category, supplier):
+        self.name = name
+        self.price = price
+        self.stock = stock
+        self.category = sys.intern(category)
+        self.supplier = sys.intern(supplier)
+    
+    def __getitem__(self, key):
+        return getattr(self, key)
+    
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+    
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+    
+    def keys(self):
+        return product_fields
+    
+    def __iter__(self):
+        return iter(product_fields)
+    
+    def __eq__(self, other):
+        return dict(self) == dict(other)
+    
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class slotted_product_store(dict):
+    
+    def __setitem__(self, product_id, product):
+        if not isinstance(product, product_slots):
+            product = product_slots(*(product[key] for key in product_fields))
+        super().__setitem__(product_id, product)
+    
+    def inventory_value(self):
+        return sum(product.price * product.stock for product in super().values())
+
+
+product_store_layouts = {
+    "columnar": columnar_product_store,
+    "slots": slotted_product_store,
+    "dict": dict
+}
+
+
+global_products = columnar_product_store()
 global_orders = []
 global_configuration = None
+global_statistics = {"inventory_value": 0, "total_revenue": 0}
 
+class order_line(namedtuple("order_line", ["product_id", "quantity", "unit_price", "subtotal", "discount"])):
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        if type(key) is str:
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+    
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self._fields else default
+    
+    def keys(self):
+        return self._fields
 
-class inventory_system:
+
+discount_tiers = {
+    "electronics": {
+        "premium": ((500, 1000), (0.10, 0.15, 0.20)),
+        "regular": ((500, 1000), (0.02, 0.05, 0.10))
+    },
+    "clothing": {
+        "premium": ((100, 200), (0.15, 0.20, 0.25)),
+        "regular": ((100, 200), (0.05, 0.10, 0.15))
+    },
+    "books": {
+        "premium": ((30, 50), (0.10, 0.20, 0.30)),
+        "regular": ((30, 50), (0.05, 0.10, 0.20))
+    },
+    "order": {
+        "premium": ((100,), (0.10, 0.15)),
+        "regular": ((200,), (0, 0.05))
+    }
+}
+
+
+class discount_engine:
+    
+    def __init__(self, tiers):
+        self.tables = {}
+        for category, customer_tiers in tiers.items():
+            for customer_type, (breakpoints, rates) in customer_tiers.items():
+                if len(rates) != len(breakpoints) + 1 or list(breakpoints) != sorted(breakpoints):
+                    raise ValueError(f"Tabla de descuentos inválida para {category}/{customer_type}")
+                self.tables[(category, customer_type)] = (array("d", breakpoints), array("d", rates))
+    
+    def rate(self, category, customer_type, price):
+        table = self.tables.get((category, customer_type))
+        if table is None:
+            return 0
+        breakpoints, rates = table
+        return rates[bisect_left(breakpoints, price)]
+    
+    def discount(self, category, customer_type, price):
+        return price * self.rate(category, customer_type, price)
+    
+    def discounts(self, category, customer_type, prices):
+        table = self.tables.get((category, customer_type))
+        if table is None:
+            return [0] * len(prices)
+        breakpoints, rates = table
+        if np is not None and len(prices) > 1000:
+            prices = np.asarray(prices, dtype=np.float64)
+            return prices * np.asarray(rates)[np.searchsorted(breakpoints, prices, side="left")]
+        return [price * rates[bisect_left(breakpoints, price)] for price in prices]
+    
+    def reprice(self, categories, category_codes, prices, customer_type):
+        if np is not None:
+            prices = np.asarray(prices, dtype=np.float64)
+            category_codes = np.asarray(category_codes)
+            discounts = np.zeros(len(prices))
+            for code, category in enumerate(categories):
+                table = self.tables.get((category, customer_type))
+                if table is None:
+                    continue
+                breakpoints, rates = table
+                mask = category_codes == code
+                selected = prices[mask]
+                discounts[mask] = selected * np.asarray(rates)[np.searchsorted(breakpoints, selected, side="left")]
+            return discounts
+        
+        tables = [self.tables.get((category, customer_type)) for category in categories]
+        discounts = array("d", bytes(8 * len(prices)))
+        for i, (code, price) in enumerate(zip(category_codes, prices)):
+            table = tables[code]
+            if table is not None:
+                discounts[i] = price * table[1][bisect_left(table[0], price)]
+        return discounts
+
+
+global_discount_engine = discount_engine(discount_tiers)
+
+
+def order_discount(customer_type, subtotal):
+    return global_discount_engine.discount("order", customer_type, subtotal)
+
+
+def order_discounts(customer_type, subtotals):
+    return global_discount_engine.discounts("order", customer_type, subtotals)
+
+
+class sorted_index:
+    block_size = 1000
+    
+    def __init__(self):
+        self.view = ([], [])
+        self.size = 0
+    
+    def __len__(self):
+        return self.size
+    
+    def add(self, key):
+        self.view = self.inserted(self.view, key)
+        self.size += 1
+    
+    def remove(self, key):
+        view = self.removed(self.view, key)
+        if view is None:
+            return False
+        self.view = view
+        self.size -= 1
+        return True
+    
+    def move(self, old_key, new_key):
+        view = self.removed(self.view, old_key)
+        if view is None:
+            self.add(new_key)
+            return
+        self.view = self.inserted(view, new_key)
+    
+    def inserted(self, view, key):
+        blocks, maxes = view
+        if not blocks:
+            return [[key]], [key]
+        
+        blocks = list(blocks)
+        maxes = list(maxes)
+        i = bisect_left(maxes, key)
+        if i == len(maxes):
+            i -= 1
+            block = blocks[i] + [key]
+            maxes[i] = key
+        else:
+            block = list(blocks[i])
+            insort(block, key)
+        
+        if len(block) > 2 * self.block_size:
+            blocks[i:i + 1] = [block[:self.block_size], block[self.block_size:]]
+            maxes[i:i + 1] = [block[self.block_size - 1], block[-1]]
+        else:
+            blocks[i] = block
+        return blocks, maxes
+    
+    def removed(self, view, key):
+        blocks, maxes = view
+        i = bisect_left(maxes, key)
+        if i == len(maxes):
+            return None
+        block = blocks[i]
+        j = bisect_left(block, key)
+        if j == len(block) or block[j] != key:
+            return None
+        
+        blocks = list(blocks)
+        maxes = list(maxes)
+        block = block[:j] + block[j + 1:]
+        if block:
+            blocks[i] = block
+            maxes[i] = block[-1]
+        else:
+            del blocks[i]
+            del maxes[i]
+        return blocks, maxes
+    
+    def range(self, low=None, high=None):
+        blocks, maxes = self.view
+        i = 0 if low is None else bisect_left(maxes, low)
+        j = 0 if low is None or i == len(blocks) else bisect_left(blocks[i], low)
+        while i < len(blocks):
+            for key in blocks[i][j:]:
+                if high is not None and key >= high:
+                    return
+                yield key
+            i += 1
+            j = 0
+    
+    def load(self, keys):
+        blocks = [keys[i:i + self.block_size] for i in range(0, len(keys), self.block_size)]
+        self.view = (blocks, [block[-1] for block in blocks])
+        self.size = len(keys)
+    
+    def largest(self, n):
+        result = []
+        for block in reversed(self.view[0]):
+            for key in reversed(block):
+                if len(result) == n:
+                    return result
+                result.append(key)
+        return result
+    
+    def __iter__(self):
+        return self.range()
+
+
+class product_index:
+    block_size = 1000
     
     def __init__(self):
+        self.names = {}
+        self.categories = {}
+        self.stock = sorted_index()
+        self.source = None
+    
+    def invalidate(self, products):
+        self.names = {}
+        self.categories = {}
+        self.stock = sorted_index()
+        self.source = products
+    
+    def ensure(self):
+        if self.source is None:
+            return
+        with global_state_lock:
+            products = self.source
+            if products is None:
+                return
+            names = {}
+            members = {}
+            keys = []
+            for product_id, product in products.items():
+                names.setdefault(product["name"], product_id)
+                members.setdefault(product["category"], []).append(product_id)
+                keys.append((product["stock"], product_id))
+            keys.sort()
+            self.stock.load(keys)
+            self.names = names
+            self.categories = {
+                category: tuple(tuple(ids[i:i + self.block_size]) for i in range(0, len(ids), self.block_size))
+                for category, ids in members.items()
+            }
+            self.source = None
+    
+    def add_product(self, product_id, product):
+        if self.source is not None:
+            return
+        self.names.setdefault(product["name"], product_id)
+        blocks = self.categories.get(product["category"], ())
+        if blocks and len(blocks[-1]) < self.block_size:
+            blocks = blocks[:-1] + (blocks[-1] + (product_id,),)
+        else:
+            blocks += ((product_id,),)
+        self.categories[product["category"]] = blocks
+        self.stock.add((product["stock"], product_id))
+    
+    def move_stock(self, product_id, previous_stock, new_stock):
+        if self.source is not None:
+            return
+        self.stock.move((previous_stock, product_id), (new_stock, product_id))
+    
+    def find_name(self, name):
+        self.ensure()
+        return self.names.get(name)
+    
+    def members(self, category):
+        self.ensure()
+        return [product_id for block in self.categories.get(category, ()) for product_id in block]
+    
+    def below_stock(self, limit):
+        self.ensure()
+        return [product_id for stock, product_id in self.stock.range(high=(limit,))]
+
+
+global_product_index = product_index()
+
+
+customer_fields = ("name", "email", "type", "total_purchases", "num_orders", "registration_date")
+customer_tiers = ["regular", "premium"]
+premium_threshold = 1000
+
+
+class customer_record:
+    __slots__ = ("store", "row")
+    
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+    
+    def __getitem__(self, key):
+        return self.store.get_field(self.row, key)
+    
+    def __setitem__(self, key, value):
+        self.store.set_field(self.row, key, value)
+    
+    def get(self, key, default=None):
+        return self[key] if key in customer_fields else default
+    
+    def keys(self):
+        return customer_fields
+    
+    def __iter__(self):
+        return iter(customer_fields)
+    
+    def __eq__(self, other):
+        return dict(self) == dict(other)
+    
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class customer_store:
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+    
+    def clear(self):
+        self.ids = []
+        self.rows = {}
+        self.names = []
+        self.emails = []
+        self.registration_dates = array("d")
+        self.total_purchases = array("d")
+        self.num_orders = array("q")
+        self.tiers = array("b")
+        self.spend_index = sorted_index()
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def __contains__(self, customer_id):
+        return customer_id in self.rows
+    
+    def __iter__(self):
+        return iter(self.ids)
+    
+    def __getitem__(self, customer_id):
+        return customer_record(self, self.rows[customer_id])
+    
+    def get(self, customer_id, default=None):
+        row = self.rows.get(customer_id)
+        return default if row is None else customer_record(self, row)
+    
+    def __setitem__(self, customer_id, customer):
+        row = self.rows.get(customer_id)
+        if row is not None:
+            for key in customer_fields:
+                self.set_field(row, key, customer[key])
+            return
+        
+        with self.lock:
+            row = self.rows[customer_id] = len(self.ids)
+            self.ids.append(customer_id)
+            self.names.append(customer["name"])
+            self.emails.append(customer["email"])
+            self.registration_dates.append(customer["registration_date"].timestamp())
+            self.total_purchases.append(customer["total_purchases"])
+            self.num_orders.append(customer["num_orders"])
+            self.tiers.append(customer_tiers.index(customer["type"]))
+            self.spend_index.add((self.total_purchases[row], row))
+    
+    def get_field(self, row, key):
+        if key == "type":
+            return customer_tiers[self.tiers[row]]
+        if key == "total_purchases":
+            return self.total_purchases[row]
+        if key == "num_orders":
+            return self.num_orders[row]
+        if key == "name":
+            return self.names[row]
+        if key == "email":
+            return self.emails[row]
+        if key == "registration_date":
+            return datetime.datetime.fromtimestamp(self.registration_dates[row])
+        raise KeyError(key)
+    
+    def set_field(self, row, key, value):
+        if key == "type":
+            self.tiers[row] = customer_tiers.index(value)
+        elif key == "total_purchases":
+            with self.lock:
+                self.spend_index.move((self.total_purchases[row], row), (value, row))
+                self.total_purchases[row] = value
+        elif key == "num_orders":
+            self.num_orders[row] = value
+        elif key == "name":
+            self.names[row] = value
+        elif key == "email":
+            self.emails[row] = value
+        elif key == "registration_date":
+            self.registration_dates[row] = value.timestamp()
+        else:
+            raise KeyError(key)
+    
+    def keys(self):
+        return list(self.ids)
+    
+    def values(self):
+        return [customer_record(self, row) for row in range(len(self.ids))]
+    
+    def items(self):
+        return [(customer_id, customer_record(self, row)) for row, customer_id in enumerate(self.ids)]
+    
+    def on_order_created(self, event):
+        kind, customer_id, amount = event
+        row = self.rows[customer_id]
+        self.set_field(row, "total_purchases", self.total_purchases[row] + amount)
+        self.num_orders[row] += 1
+        if self.total_purchases[row] > premium_threshold:
+            self.tiers[row] = 1
+    
+    def top_by_spend(self, n):
+        return [(self.ids[row], spend) for spend, row in self.spend_index.largest(n)]
+    
+    def near_threshold(self, margin, threshold=premium_threshold):
+        return [
+            (self.ids[row], spend)
+            for spend, row in self.spend_index.range((threshold - margin,), (threshold, float("inf")))
+        ]
+
+
+class event_stream:
+    
+    def __init__(self, history=10000):
+        self.subscribers = []
+        self.recent = deque(maxlen=history)
+        self.published = 0
+    
+    def subscribe(self, subscriber):
+        self.subscribers.append(subscriber)
+    
+    def publish(self, *event):
+        self.recent.append(event)
+        self.published += 1
+        for subscriber in self.subscribers:
+            subscriber(event)
+
+
+global_customers = customer_store()
+global_order_events = event_stream()
+global_order_events.subscribe(global_customers.on_order_created)
+
+
+class atomic_sequence:
+    
+    def __init__(self, start=1):
+        self.value = start
+        self.lock = threading.Lock()
+    
+    def next(self):
+        with self.lock:
+            value = self.value
+            self.value += 1
+        return value
+    
+    def reset(self, start=1):
+        with self.lock:
+            self.value = start
+
+
+global_order_ids = atomic_sequence()
+global_state_lock = threading.Lock()
+global_mutation_hooks = []
+entity_locks = {}
+entity_locks_guard = threading.Lock()
+
+
+def lock_for_entity(key):
+    lock = entity_locks.get(key)
+    if lock is None:
+        with entity_locks_guard:
+            lock = entity_locks.setdefault(key, threading.Lock())
+    return lock
+
+
+class entity_lock_set:
+    
+    def __init__(self, product_ids=(), customer_ids=()):
+        keys = sorted({("product", product_id) for product_id in product_ids})
+        keys += sorted({("customer", customer_id) for customer_id in customer_ids})
+        self.locks = [lock_for_entity(key) for key in keys]
+    
+    def __enter__(self):
+        for lock in self.locks:
+            lock.acquire()
+        return self
+    
+    def __exit__(self, *exc_info):
+        for lock in reversed(self.locks):
+            lock.release()
+
+
+class write_gate:
+    
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.writers = 0
+        self.closed = False
+    
+    def __enter__(self):
+        with self.condition:
+            while self.closed:
+                self.condition.wait()
+            self.writers += 1
+        return self
+    
+    def __exit__(self, *exc_info):
+        with self.condition:
+            self.writers -= 1
+            if not self.writers:
+                self.condition.notify_all()
+    
+    def close(self):
+        with self.condition:
+            while self.closed:
+                self.condition.wait()
+            self.closed = True
+            while self.writers:
+                self.condition.wait()
+    
+    def open(self):
+        with self.condition:
+            self.closed = False
+            self.condition.notify_all()
+
+
+global_write_gate = write_gate()
+mutating_actions = ("add_product", "update_stock", "create_order", "add_customer")
+
+
+history_limit = 10000
+
+
+audit_segment_name = re.compile(r"audit-(\d+)\.jsonl")
+
+
+class audit_log:
+    
+    def __init__(self, directory=None, max_segment_bytes=64 * 1024 * 1024, max_segments=None,
+                 tail_size=1000, index_every=1000, buffer_size=1 << 16):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self.index_every = index_every
+        self.buffer_size = buffer_size
+        self.tail_lines = deque(maxlen=tail_size)
+        self.segments = []
+        self.file = None
+        self.lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.load_segments()
+    
+    def load_segments(self):
+        numbers = sorted(
+            int(match.group(1)) for match in map(audit_segment_name.fullmatch, os.listdir(self.directory)) if match
+        )
+        if self.max_segments is not None and len(numbers) > self.max_segments:
+            for number in numbers[:len(numbers) - self.max_segments]:
+                os.remove(os.path.join(self.directory, f"audit-{number:06d}.jsonl"))
+            numbers = numbers[len(numbers) - self.max_segments:]
+        tail = deque(maxlen=self.tail_lines.maxlen)
+        for number in numbers:
+            path = os.path.join(self.directory, f"audit-{number:06d}.jsonl")
+            segment = {
+                "number": number,
+                "path": path,
+                "first_timestamp": None,
+                "last_timestamp": None,
+                "entries": 0,
+                "offsets": []
+            }
+            offset = 0
+            last_line = None
+            with open(path, "rb") as file:
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    if segment["entries"] % self.index_every == 0:
+                        segment["offsets"].append((json.loads(line)["timestamp"], offset))
+                    segment["entries"] += 1
+                    offset += len(line)
+                    last_line = line
+                    tail.append(line)
+            if offset < os.path.getsize(path):
+                os.truncate(path, offset)
+            if last_line is not None:
+                segment["first_timestamp"] = segment["offsets"][0][0]
+                segment["last_timestamp"] = json.loads(last_line)["timestamp"]
+            self.segments.append(segment)
+        
+        self.tail_lines.extend(line[:-1].decode("utf-8") for line in tail)
+        if self.segments:
+            self.file = open(self.segments[-1]["path"], "ab", buffering=self.buffer_size)
+    
+    def record(self, action, data):
+        timestamp = time.time()
+        line = json.dumps({"action": action, "timestamp": timestamp, "data": data}, default=str)
+        with self.lock:
+            self.tail_lines.append(line)
+            if self.directory is not None:
+                self.write(timestamp, line)
+    
+    def write(self, timestamp, line):
+        if self.file is None or self.file.tell() >= self.max_segment_bytes:
+            self.rotate()
+        segment = self.segments[-1]
+        if segment["entries"] % self.index_every == 0:
+            segment["offsets"].append((timestamp, self.file.tell()))
+        if segment["first_timestamp"] is None:
+            segment["first_timestamp"] = timestamp
+        segment["last_timestamp"] = timestamp
+        segment["entries"] += 1
+        self.file.write((line + "\n").encode("utf-8"))
+    
+    def rotate(self):
+        if self.file is not None:
+            self.file.close()
+        number = self.segments[-1]["number"] + 1 if self.segments else 0
+        path = os.path.join(self.directory, f"audit-{number:06d}.jsonl")
+        self.file = open(path, "ab", buffering=self.buffer_size)
+        self.segments.append({
+            "number": number,
+            "path": path,
+            "first_timestamp": None,
+            "last_timestamp": None,
+            "entries": 0,
+            "offsets": []
+        })
+        if self.max_segments is not None:
+            while len(self.segments) > self.max_segments:
+                os.remove(self.segments.pop(0)["path"])
+    
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+    
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+    
+    def __len__(self):
+        return len(self.tail_lines)
+    
+    def tail(self):
+        with self.lock:
+            lines = list(self.tail_lines)
+        return [self.decode(line) for line in lines]
+    
+    def decode(self, line):
+        entry = json.loads(line)
+        entry["timestamp"] = datetime.datetime.fromtimestamp(entry["timestamp"])
+        return entry
+    
+    def read_range(self, start, end):
+        if isinstance(start, datetime.datetime):
+            start = start.timestamp()
+        if isinstance(end, datetime.datetime):
+            end = end.timestamp()
+        self.flush()
+        
+        entries = []
+        for segment in list(self.segments):
+            if segment["first_timestamp"] is None:
+                continue
+            if segment["last_timestamp"] < start or segment["first_timestamp"] > end:
+                continue
+            
+            position = bisect_left(segment["offsets"], (start,)) - 1
+            offset = segment["offsets"][max(position, 0)][1]
+            with open(segment["path"], "rb") as file:
+                file.seek(offset)
+                for line in file:
+                    entry = json.loads(line)
+                    if entry["timestamp"] > end:
+                        break
+                    if entry["timestamp"] >= start:
+                        entry["timestamp"] = datetime.datetime.fromtimestamp(entry["timestamp"])
+                        entries.append(entry)
+        return entries
+
+
+class alert_engine:
+    
+    def __init__(self, output, low_threshold=10, excess_threshold=1000, category_thresholds=None,
+                 hysteresis=5, window=0.0):
+        self.output = output
+        self.low_threshold = low_threshold
+        self.excess_threshold = excess_threshold
+        self.category_thresholds = category_thresholds or {}
+        self.hysteresis = hysteresis
+        self.window = window
+        self.states = {}
+        self.pending = {}
+        self.window_start = None
+        self.timer = None
+        self.fired = 0
+        self.lock = threading.Lock()
+    
+    def thresholds(self, category):
+        return self.category_thresholds.get(category, (self.low_threshold, self.excess_threshold))
+    
+    def observe(self, product_id, product):
+        stock = product["stock"]
+        low, excess = self.thresholds(product["category"])
+        
+        with self.lock:
+            now = time.monotonic()
+            if self.window_start is not None and now - self.window_start >= self.window:
+                self.emit()
+            
+            current = self.states.get(product_id, "normal")
+            if stock < low:
+                state = "low"
+            elif stock > excess:
+                state = "excess"
+            elif current == "low" and stock < low + self.hysteresis:
+                state = "low"
+            elif current == "excess" and stock > excess - self.hysteresis:
+                state = "excess"
+            else:
+                state = "normal"
+            
+            if state == current:
+                return False
+            
+            if state == "normal":
+                del self.states[product_id]
+            else:
+                self.states[product_id] = state
+            self.pending[product_id] = (state, stock)
+            self.fired += 1
+            
+            if self.window_start is None:
+                self.window_start = now
+            if now - self.window_start >= self.window:
+                self.emit()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.window, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+            return True
+    
+    def emit(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        for product_id, (state, stock) in self.pending.items():
+            if state == "low":
+                self.output.append(f"Stock bajo para producto {product_id} ({stock} unidades)")
+            elif state == "excess":
+                self.output.append(f"Stock excesivo para producto {product_id} ({stock} unidades)")
+        self.pending = {}
+        self.window_start = None
+    
+    def flush(self):
+        with self.lock:
+            self.emit()
+    
+    def active_alerts(self):
+        with self.lock:
+            return dict(self.states)
+
+
+snapshot_magic = b"INVSNAP1"
+snapshot_section = struct.Struct("<4sQ")
+
+
+def encode_strings(values):
+    if all(type(value) is str for value in values):
+        return b"S" + "\0".join(values).encode("utf-8")
+    return b"J" + json.dumps(list(values)).encode("utf-8")
+
+
+def decode_strings(payload, count):
+    if count == 0:
+        return []
+    kind = bytes(payload[:1])
+    if kind == b"S":
+        return str(payload[1:], "utf-8").split("\0")
+    return json.loads(bytes(payload[1:]))
+
+
+def encode_records(records):
+    return "\n".join(json.dumps(record, default=str) for record in records).encode("utf-8")
+
+
+def decode_records(payload, date_keys):
+    records = []
+    for line in str(payload, "utf-8").splitlines():
+        record = json.loads(line)
+        for key in date_keys:
+            if isinstance(record[1].get(key), str):
+                record[1][key] = datetime.datetime.fromisoformat(record[1][key])
+        records.append(record)
+    return records
+
+
+class snapshot_manager:
+    
+    def __init__(self, directory, system):
+        self.directory = directory
+        self.system = system
+        self.dirty_products = set()
+        self.dirty_customers = set()
+        self.order_mark = len(system.orders)
+        self.has_base = False
+        self.writer = None
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.sequence = max([self.parse_name(name)[0] for name in self.files()] or [0])
+        global_mutation_hooks.append(self.track)
+    
+    def track(self, tags):
+        for tag in tags:
+            if type(tag) is tuple:
+                if tag[0] == "product":
+                    self.dirty_products.add(tag[1])
+                elif tag[0] == "customer":
+                    self.dirty_customers.add(tag[1])
+    
+    def files(self):
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith("snapshot-") and name.endswith(".bin")
+        )
+    
+    def parse_name(self, name):
+        number, kind = name[len("snapshot-"):-len(".bin")].split("-")
+        return int(number), kind
+    
+    def capture(self, full):
+        global_write_gate.close()
+        try:
+            return self.capture_sections(full)
+        finally:
+            global_write_gate.open()
+    
+    def capture_sections(self, full):
+        system = self.system
+        with global_state_lock:
+            if full:
+                product_ids = list(system.products)
+                customer_ids = list(system.customers)
+                orders = list(system.orders)
+            else:
+                product_ids = list(self.dirty_products)
+                customer_ids = list(self.dirty_customers)
+                orders = system.orders[self.order_mark:]
+            self.dirty_products = set()
+            self.dirty_customers = set()
+            self.order_mark = len(system.orders)
+            
+            statistics = dict(system.statistics)
+            statistics["next_order_id"] = global_order_ids.value
+            sections = [(b"STAT", json.dumps(statistics).encode("utf-8"))]
+            
+            store = system.products
+            if full and isinstance(store, columnar_product_store):
+                sections += [
+                    (b"PIDS", encode_strings(store.ids)),
+                    (b"PNAM", encode_strings(store.names)),
+                    (b"PPRC", store.prices.tobytes()),
+                    (b"PSTK", store.stocks.tobytes()),
+                    (b"CATS", encode_strings(store.categories.values)),
+                    (b"PCAT", store.category_codes.tobytes()),
+                    (b"SUPS", encode_strings(store.suppliers.values)),
+                    (b"PSUP", store.supplier_codes.tobytes())
+                ]
+            else:
+                rows = columnar_product_store()
+                for product_id in product_ids:
+                    rows[product_id] = store[product_id]
+                if isinstance(store, columnar_product_store):
+                    sections.append((b"PROW", array("q", [store.rows[product_id] for product_id in rows.ids]).tobytes()))
+                sections += [
+                    (b"PIDS", encode_strings(rows.ids)),
+                    (b"PNAM", encode_strings(rows.names)),
+                    (b"PPRC", rows.prices.tobytes()),
+                    (b"PSTK", rows.stocks.tobytes()),
+                    (b"CATS", encode_strings(rows.categories.values)),
+                    (b"PCAT", rows.category_codes.tobytes()),
+                    (b"SUPS", encode_strings(rows.suppliers.values)),
+                    (b"PSUP", rows.supplier_codes.tobytes())
+                ]
+            
+            sections.append((b"CUST", encode_records(
+                (customer_id, dict(system.customers[customer_id])) for customer_id in customer_ids
+            )))
+            sections.append((b"ORDS", encode_records((order["id"], order) for order in orders)))
+        return sections
+    
+    def checkpoint(self, full=False, background=False):
+        with self.lock:
+            full = full or not self.has_base
+            sections = self.capture(full)
+            self.sequence += 1
+            path = os.path.join(self.directory, f"snapshot-{self.sequence:08d}-{'full' if full else 'delta'}.bin")
+            self.has_base = True
+        
+        if not background:
+            self.write(path, sections)
+            return path
+        
+        self.wait()
+        self.writer = threading.Thread(target=self.write, args=(path, sections))
+        self.writer.start()
+        return path
+    
+    def wait(self):
+        if self.writer is not None:
+            self.writer.join()
+            self.writer = None
+    
+    def write(self, path, sections):
+        temporary = path + ".tmp"
+        with open(temporary, "wb", buffering=1 << 20) as file:
+            file.write(snapshot_magic)
+            for tag, payload in sections:
+                file.write(snapshot_section.pack(tag, len(payload)))
+                file.write(payload)
+        os.replace(temporary, path)
+    
+    def read(self, path):
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)
+        if bytes(view[:len(snapshot_magic)]) != snapshot_magic:
+            raise ValueError(f"Archivo de snapshot inválido: {path}")
+        sections = {}
+        offset = len(snapshot_magic)
+        while offset < len(view):
+            tag, length = snapshot_section.unpack_from(view, offset)
+            offset += snapshot_section.size
+            sections[tag] = view[offset:offset + length]
+            offset += length
+        return mapping, sections
+    
+    def load_products(self, sections):
+        categories = code_table()
+        for value in decode_strings(sections[b"CATS"], len(sections[b"CATS"])):
+            categories.encode(value)
+        suppliers = code_table()
+        for value in decode_strings(sections[b"SUPS"], len(sections[b"SUPS"])):
+            suppliers.encode(value)
+        return (
+            sections[b"PIDS"], sections[b"PNAM"], sections[b"PPRC"].cast("d"), sections[b"PSTK"].cast("q"),
+            categories, sections[b"PCAT"].cast("I"), suppliers, sections[b"PSUP"].cast("I")
+        )
+    
+    def restore(self):
+        files = self.files()
+        full = [name for name in files if self.parse_name(name)[1] == "full"]
+        if not full:
+            return 0
+        chain = files[files.index(full[-1]):]
+        
+        system = self.system
+        store = system.products
+        reset_global_state()
+        for position, name in enumerate(chain):
+            mapping, sections = self.read(os.path.join(self.directory, name))
+            ids, names, prices, stocks, categories, category_codes, suppliers, supplier_codes = \
+                self.load_products(sections)
+            
+            attached = position == 0 and isinstance(store, columnar_product_store)
+            if attached:
+                store.attach(mapping, ids, names, prices, stocks, categories, category_codes, suppliers, supplier_codes)
+            elif b"PROW" in sections and isinstance(store, columnar_product_store):
+                rows = array("q")
+                rows.frombytes(sections[b"PROW"])
+                store.patch(rows, decode_strings(ids, len(rows)), decode_strings(names, len(rows)), prices, stocks,
+                            categories, category_codes, suppliers, supplier_codes)
+            else:
+                ids = decode_strings(ids, len(prices))
+                names = decode_strings(names, len(prices))
+                for row, product_id in enumerate(ids):
+                    store[product_id] = {
+                        "name": names[row],
+                        "price": prices[row],
+                        "stock": stocks[row],
+                        "category": categories.values[category_codes[row]],
+                        "supplier": suppliers.values[supplier_codes[row]]
+                    }
+            
+            for customer_id, customer in decode_records(sections[b"CUST"], ("registration_date",)):
+                system.customers[customer_id] = customer
+            for order_id, order in decode_records(sections[b"ORDS"], ("date",)):
+                order["items"] = [order_line(*item) for item in order["items"]]
+                system.orders.append(order)
+            
+            statistics = json.loads(bytes(sections[b"STAT"]))
+            global_order_ids.reset(statistics.pop("next_order_id"))
+            system.statistics.update(statistics)
+            
+            del sections, ids, names, prices, stocks, category_codes, supplier_codes
+            if not attached:
+                mapping.close()
+        
+        system.index.invalidate(store)
+        system.cache.clear()
+        self.dirty_products = set()
+        self.dirty_customers = set()
+        self.order_mark = len(system.orders)
+        self.has_base = True
+        return len(chain)
+
+
+def use_product_store(layout="columnar"):
+    global global_products
+    global_products = product_store_layouts[layout]()
+    reset_global_state()
+    return global_products
+
+
+def reset_global_state():
+    global_products.clear()
+    global_customers.clear()
+    global_order_events.recent.clear()
+    global_orders.clear()
+    global_product_index.__init__()
+    global_statistics.update(inventory_value=0, total_revenue=0)
+    global_order_ids.reset()
+    global_cache.clear()
+
+
+class inventory_system:
+    
+    def __init__(self, concurrent=False, audit=None, cache=None):
+        self.concurrent = concurrent
+        self.cache = cache if cache is not None else global_cache
+        self.mutation_hooks = global_mutation_hooks
+        if self.cache.invalidate_tags not in self.mutation_hooks:
+            self.mutation_hooks.append(self.cache.invalidate_tags)
         self.products = global_products
+        self.index = global_product_index
         self.customers = global_customers
+        self.events = global_order_events
         self.orders = global_orders
-        self.history = []
-        self.statistics = {}
-        self.alerts = []
+        self.history = deque(maxlen=history_limit)
+        self.statistics = global_statistics
+        self.materialized_report = None
+        self.report_refresher = None
+        self.alerts = deque(maxlen=history_limit)
+        self.alert_engine = alert_engine(self.alerts)
         self.suppliers = {}
         self.invoices = []
         self.returns = []
         self.employees = {}
-        self.reports = []
-        self.audit = []
+        self.reports = deque(maxlen=history_limit)
+        self.audit = audit if audit is not None else audit_log()
         self.configuration = global_configuration
         
     def process_everything(self, action, data):
+        if action not in mutating_actions:
+            return self.run_action(action, data)
+        
+        with global_write_gate:
+            return self.run_mutation(action, data)
+    
+    def run_mutation(self, action, data):
+        if not self.concurrent:
+            return self.run_action(action, data)
+        
+        if action in ("add_product", "update_stock"):
+            locks = entity_lock_set(product_ids=[data.get("id")])
+        elif action == "create_order":
+            locks = entity_lock_set(
+                product_ids=[item["product_id"] for item in data.get("items", [])],
+                customer_ids=[data.get("customer_id")]
+            )
+        else:
+            locks = entity_lock_set(customer_ids=[data.get("id")])
+        
+        with locks:
+            return self.run_action(action, data)
+    
+    def run_action(self, action, data):
         if action == "add_product":
             if "id" in data and "name" in data and "price" in data:
                 if data["price"] > 0:
                     if data["id"] not in self.products:
-                        self.products[data["id"]] = {
-                            "name": data["name"],
-                            "price": data["price"],
-                            "stock": data.get("stock", 0),
-                            "category": data.get("category", "general"),
-                            "supplier": data.get("supplier", "unknown")
-                        }
+                        try:
+                            self.products[data["id"]] = {
+                                "name": data["name"],
+                                "price": data["price"],
+                                "stock": data.get("stock", 0),
+                                "category": data.get("category", "general"),
+                                "supplier": data.get("supplier", "unknown")
+                            }
+                        except ValueError:
+                            return False
+                        with global_state_lock:
+                            self.index.add_product(data["id"], self.products[data["id"]])
+                            self.statistics["inventory_value"] += data["price"] * self.products[data["id"]]["stock"]
                         self.history.append(f"Producto {data['id']} agregado")
-                        self.audit.append({
-                            "action": "add_product",
-                            "timestamp": datetime.datetime.now(),
-                            "data": data
-                        })
-                        if self.products[data["id"]]["stock"] < 10:
-                            self.alerts.append(f"Stock bajo para {data['name']}")
+                        self.audit.record("add_product", data)
+                        self.alert_engine.observe(data["id"], self.products[data["id"]])
+                        self.mutated(("product", data["id"]), ("category", self.products[data["id"]]["category"]), "stock")
                         return True
                     else:
                         return False
@@ -64,24 +1435,18 @@ class inventory_system:
         elif action == "update_stock":
             if "id" in data and "quantity" in data:
                 if data["id"] in self.products:
-                    previous_stock = self.products[data["id"]]["stock"]
-                    self.products[data["id"]]["stock"] += data["quantity"]
+                    new_stock = self.products[data["id"]]["stock"] + data["quantity"]
                     
-                    if self.products[data["id"]]["stock"] < 0:
-                        self.products[data["id"]]["stock"] = previous_stock
+                    if new_stock < 0:
                         return False
                     
-                    self.history.append(f"Stock actualizado para {data['id']}")
-                    self.audit.append({
-                        "action": "update_stock",
-                        "timestamp": datetime.datetime.now(),
-                        "data": data
-                    })
+                    try:
+                        self.set_stock(data["id"], new_stock)
+                    except ValueError:
+                        return False
                     
-                    if self.products[data["id"]]["stock"] < 10:
-                        self.alerts.append(f"Stock bajo para producto {data['id']}")
-                    elif self.products[data["id"]]["stock"] > 1000:
-                        self.alerts.append(f"Stock excesivo para producto {data['id']}")
+                    self.history.append(f"Stock actualizado para {data['id']}")
+                    self.audit.record("update_stock", data)
                     
                     return True
                 else:
@@ -92,48 +1457,33 @@ class inventory_system:
         elif action == "create_order":
             if "customer_id" in data and "items" in data:
                 if data["customer_id"] in self.customers:
-                    order_id = len(self.orders) + 1
                     total = 0
                     processed_items = []
                     
+                    requested = {}
                     for item in data["items"]:
-                        if item["product_id"] in self.products:
-                            product = self.products[item["product_id"]]
-                            if product["stock"] >= item["quantity"]:
-                                subtotal = product["price"] * item["quantity"]
-                                
-                                if self.customers[data["customer_id"]]["type"] == "premium":
-                                    if subtotal > 100:
-                                        discount = subtotal * 0.15
-                                    else:
-                                        discount = subtotal * 0.10
-                                elif self.customers[data["customer_id"]]["type"] == "regular":
-                                    if subtotal > 200:
-                                        discount = subtotal * 0.05
-                                    else:
-                                        discount = 0
-                                else:
-                                    discount = 0
-                                
-                                total += subtotal - discount
-                                
-                                self.products[item["product_id"]]["stock"] -= item["quantity"]
-                                
-                                processed_items.append({
-                                    "product_id": item["product_id"],
-                                    "quantity": item["quantity"],
-                                    "unit_price": product["price"],
-                                    "subtotal": subtotal,
-                                    "discount": discount
-                                })
-                                
-                                if self.products[item["product_id"]]["stock"] < 10:
-                                    self.alerts.append(f"Stock bajo después de pedido para {item['product_id']}")
-                            else:
-                                return False
-                        else:
+                        if item["product_id"] not in self.products:
+                            return False
+                        requested[item["product_id"]] = requested.get(item["product_id"], 0) + item["quantity"]
+                    
+                    for product_id, quantity in requested.items():
+                        if self.products[product_id]["stock"] < quantity:
                             return False
                     
+                    for item in data["items"]:
+                        product = self.products[item["product_id"]]
+                        subtotal = product["price"] * item["quantity"]
+                        discount = order_discount(self.customers[data["customer_id"]]["type"], subtotal)
+                        
+                        total += subtotal - discount
+                        
+                        self.set_stock(item["product_id"], product["stock"] - item["quantity"])
+                        
+                        processed_items.append(order_line(
+                            item["product_id"], item["quantity"], product["price"], subtotal, discount
+                        ))
+                    
+                    order_id = self.next_order_id()
                     new_order = {
                         "id": order_id,
                         "customer_id": data["customer_id"],
@@ -144,18 +1494,12 @@ class inventory_system:
                     }
                     
                     self.orders.append(new_order)
+                    self.add_revenue(total)
                     self.history.append(f"Pedido {order_id} creado")
-                    self.audit.append({
-                        "action": "create_order",
-                        "timestamp": datetime.datetime.now(),
-                        "data": new_order
-                    })
-                    
-                    self.customers[data["customer_id"]]["total_purchases"] += total
-                    self.customers[data["customer_id"]]["num_orders"] += 1
+                    self.audit.record("create_order", new_order)
                     
-                    if self.customers[data["customer_id"]]["total_purchases"] > 1000:
-                        self.customers[data["customer_id"]]["type"] = "premium"
+                    self.events.publish("order_created", data["customer_id"], total)
+                    self.mutated(("customer", data["customer_id"]), "orders")
                     
                     return order_id
                 else:
@@ -175,11 +1519,8 @@ class inventory_system:
                         "registration_date": datetime.datetime.now()
                     }
                     self.history.append(f"Cliente {data['id']} agregado")
-                    self.audit.append({
-                        "action": "add_customer",
-                        "timestamp": datetime.datetime.now(),
-                        "data": data
-                    })
+                    self.audit.record("add_customer", data)
+                    self.mutated(("customer", data["id"]))
                     return True
                 else:
                     return False
@@ -187,26 +1528,18 @@ class inventory_system:
                 return False
                 
         elif action == "generate_report":
-            total_products = len(self.products)
-            total_customers = len(self.customers)
-            total_orders = len(self.orders)
+            if data.get("materialized") and self.materialized_report is not None:
+                return self.materialized_report
             
-            inventory_value = 0
-            for prod_id, prod in self.products.items():
-                inventory_value += prod["price"] * prod["stock"]
-            
-            total_revenue = 0
-            for order in self.orders:
-                total_revenue += order["total"]
+            report = self.snapshot_report()
             
-            report = {
-                "date": datetime.datetime.now(),
-                "total_products": total_products,
-                "total_customers": total_customers,
-                "total_orders": total_orders,
-                "inventory_value": inventory_value,
-                "total_revenue": total_revenue
-            }
+            if data.get("verify"):
+                recomputed = self.recompute_aggregates()
+                report["recomputed"] = recomputed
+                report["consistent"] = all(
+                    abs(report[key] - value) <= 1e-6 * max(1, abs(value))
+                    for key, value in recomputed.items()
+                )
             
             self.reports.append(report)
             return report
@@ -214,158 +1547,724 @@ class inventory_system:
         else:
             return None
     
-    def get_product_by_name(self, name):
+    def create_orders_bulk(self, orders):
+        with global_write_gate:
+            if not self.concurrent:
+                return self.run_orders_bulk(orders)
+            
+            locks = entity_lock_set(
+                product_ids=[item["product_id"] for data in orders for item in data.get("items") or []],
+                customer_ids=[data.get("customer_id") for data in orders]
+            )
+            with locks:
+                return self.run_orders_bulk(orders)
+    
+    def run_orders_bulk(self, orders):
+        results = []
+        working_stock = {}
+        accepted = []
+        batch_product_ids = []
+        batch_quantities = []
+        batch_prices = []
+        
+        for data in orders:
+            customer = self.customers.get(data.get("customer_id"))
+            items = data.get("items")
+            if customer is None or items is None:
+                results.append(False)
+                continue
+            
+            product_ids = [item["product_id"] for item in items]
+            quantities = [item["quantity"] for item in items]
+            reserved = {}
+            for product_id, quantity in zip(product_ids, quantities):
+                available = reserved.get(product_id)
+                if available is None:
+                    available = working_stock.get(product_id)
+                if available is None:
+                    if product_id not in self.products:
+                        break
+                    available = self.products[product_id]["stock"]
+                if available < quantity:
+                    break
+                reserved[product_id] = available - quantity
+            else:
+                working_stock.update(reserved)
+                accepted.append((len(results), data, customer, len(batch_product_ids)))
+                batch_product_ids += product_ids
+                batch_quantities += quantities
+                results.append(False)
+                continue
+            
+            results.append(False)
+        
+        products = self.products
+        batch_prices = [products[product_id]["price"] for product_id in batch_product_ids]
+        batch_subtotals = list(map(mul, batch_prices, batch_quantities))
+        tier_discounts = {}
+        if batch_subtotals:
+            for tier in customer_tiers:
+                discounts = order_discounts(tier, batch_subtotals)
+                tier_discounts[tier] = discounts.tolist() if np is not None and isinstance(discounts, np.ndarray) else discounts
+        
+        ends = [start for position, data, customer, start in accepted[1:]] + [len(batch_product_ids)]
+        for (position, data, customer, start), end in zip(accepted, ends):
+            subtotals = batch_subtotals[start:end]
+            discounts = tier_discounts[customer["type"]][start:end]
+            total = 0
+            for amount in map(sub, subtotals, discounts):
+                total += amount
+            
+            order_id = self.next_order_id()
+            self.orders.append({
+                "id": order_id,
+                "customer_id": data["customer_id"],
+                "items": list(map(
+                    order_line, batch_product_ids[start:end], batch_quantities[start:end], batch_prices[start:end],
+                    subtotals, discounts
+                )),
+                "total": total,
+                "date": datetime.datetime.now(),
+                "status": "pending"
+            })
+            self.add_revenue(total)
+            
+            self.events.publish("order_created", data["customer_id"], total)
+            self.mutated(("customer", data["customer_id"]), "orders")
+            results[position] = order_id
+        
+        for product_id, stock in working_stock.items():
+            self.set_stock(product_id, stock)
+        
+        self.history.append(f"{len(accepted)} pedidos creados en lote")
+        self.audit.record("create_orders_bulk", {"orders": len(orders), "created": len(accepted)})
+        return results
+    
+    def set_stock(self, product_id, new_stock):
+        product = self.products[product_id]
+        with global_state_lock:
+            previous_stock = product["stock"]
+            product["stock"] = new_stock
+            self.index.move_stock(product_id, previous_stock, new_stock)
+            self.statistics["inventory_value"] += product["price"] * (new_stock - previous_stock)
+        self.alert_engine.observe(product_id, product)
+        self.mutated(("product", product_id), "stock")
+    
+    def mutated(self, *tags):
+        for hook in self.mutation_hooks:
+            hook(tags)
+    
+    def add_revenue(self, amount):
+        with global_state_lock:
+            self.statistics["total_revenue"] += amount
+    
+    def next_order_id(self):
+        return global_order_ids.next()
+    
+    def snapshot_report(self):
+        return {
+            "date": datetime.datetime.now(),
+            "total_products": len(self.products),
+            "total_customers": len(self.customers),
+            "total_orders": len(self.orders),
+            "inventory_value": self.statistics["inventory_value"],
+            "total_revenue": self.statistics["total_revenue"]
+        }
+    
+    def recompute_aggregates(self):
+        inventory_value = 0
         for prod_id, prod in self.products.items():
-            if prod["name"] == name:
-                return prod
-        return None
+            inventory_value += prod["price"] * prod["stock"]
+        
+        total_revenue = 0
+        for order in self.orders:
+            total_revenue += order["total"]
+        
+        return {"inventory_value": inventory_value, "total_revenue": total_revenue}
+    
+    def start_materialized_report(self, interval=5.0):
+        self.stop_materialized_report()
+        stop = threading.Event()
+        
+        def refresh():
+            while True:
+                self.materialized_report = self.snapshot_report()
+                if stop.wait(interval):
+                    return
+        
+        self.report_refresher = (stop, threading.Thread(target=refresh, daemon=True))
+        self.report_refresher[1].start()
+    
+    def stop_materialized_report(self):
+        if self.report_refresher is not None:
+            stop, thread = self.report_refresher
+            stop.set()
+            thread.join()
+            self.report_refresher = None
+            self.materialized_report = None
+    
+    def get_product_by_name(self, name):
+        product_id = self.index.find_name(name)
+        if product_id is None:
+            return None
+        return self.products[product_id]
     
     def get_products_by_category(self, category):
-        products_category = []
-        for prod_id, prod in self.products.items():
-            if prod["category"] == category:
-                products_category.append(prod)
-        return products_category
+        key = ("category", category)
+        products = self.cache.get(key)
+        if products is None:
+            generation = self.cache.generation
+            products = [self.products[prod_id] for prod_id in self.index.members(category)]
+            self.cache.save(key, products, tags=(("category", category),), generation=generation)
+        return list(products)
     
     def get_low_stock_products(self, limit=10):
-        low_stock_products = []
-        for prod_id, prod in self.products.items():
-            if prod["stock"] < limit:
-                low_stock_products.append(prod)
-        return low_stock_products
+        key = ("low_stock", limit)
+        products = self.cache.get(key)
+        if products is None:
+            generation = self.cache.generation
+            products = [self.products[prod_id] for prod_id in self.index.below_stock(limit)]
+            self.cache.save(key, products, tags=("stock",), generation=generation)
+        return list(products)
 
 
-def validate_customer_email(email):
+email_pattern = re.compile(r"[^@]+@(?=[^@]*\.)[^@]{3,}")
+
+
+def validate_email(email):
     if not email:
         return False
-    if "@" not in email:
-        return False
-    if "." not in email:
-        return False
-    parts = email.split("@")
-    if len(parts) != 2:
-        return False
-    if len(parts[0]) < 1:
-        return False
-    if len(parts[1]) < 3:
-        return False
-    if "." not in parts[1]:
-        return False
-    return True
+    return email_pattern.fullmatch(email) is not None
 
 
-def validate_supplier_email(email):
+def email_rejection_reason(email):
     if not email:
-        return False
+        return "Email vacío"
     if "@" not in email:
-        return False
+        return "Falta @"
     if "." not in email:
-        return False
+        return "Falta punto"
     parts = email.split("@")
     if len(parts) != 2:
-        return False
+        return "Más de una @"
     if len(parts[0]) < 1:
-        return False
+        return "Usuario vacío"
     if len(parts[1]) < 3:
-        return False
+        return "Dominio demasiado corto"
     if "." not in parts[1]:
-        return False
-    return True
+        return "Dominio sin punto"
+    return None
+
+
+def validate_customer_email(email):
+    return validate_email(email)
+
+
+def validate_supplier_email(email):
+    return validate_email(email)
 
 
 def validate_employee_email(email):
-    if not email:
-        return False
-    if "@" not in email:
-        return False
-    if "." not in email:
-        return False
-    parts = email.split("@")
-    if len(parts) != 2:
-        return False
-    if len(parts[0]) < 1:
-        return False
-    if len(parts[1]) < 3:
-        return False
-    if "." not in parts[1]:
-        return False
-    return True
+    return validate_email(email)
+
+
+def stream_invalid_emails(source, column=0, delimiter=",", has_header=False, batch_size=10000):
+    if isinstance(source, str):
+        with open(source, newline="", encoding="utf-8") as file:
+            yield from stream_invalid_emails(file, column, delimiter, has_header, batch_size)
+        return
+    
+    rows = csv.reader(source, delimiter=delimiter)
+    line_number = 0
+    if has_header:
+        header = next(rows, None)
+        line_number += 1
+        if isinstance(column, str):
+            column = header.index(column)
+    
+    match = email_pattern.fullmatch
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        emails = [row[column] if len(row) > column else "" for row in batch]
+        for offset, matched in enumerate(map(match, emails)):
+            if matched is None:
+                yield line_number + offset + 1, batch[offset], email_rejection_reason(emails[offset]) or "Formato inválido"
+        line_number += len(batch)
+
+
+def benchmark_email_stream(rows=1000000, path="benchmark_emails.csv"):
+    import tracemalloc
+    
+    with open(path, "w", encoding="utf-8") as file:
+        for i in range(rows):
+            email = f"usuario{i}@dominio{i % 100}.com" if i % 50 else f"usuario{i}dominio.com"
+            file.write(f"{i},Nombre {i},{email}\n")
+    
+    start = time.perf_counter()
+    rejected = sum(1 for rejection in stream_invalid_emails(path, column=2))
+    elapsed = time.perf_counter() - start
+    
+    tracemalloc.start()
+    for rejection in stream_invalid_emails(path, column=2):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    os.remove(path)
+    
+    print(f"{rows} filas: {rows / elapsed:.0f} filas/s, {rejected} rechazadas, pico de memoria {peak / 1024:.0f} KiB")
+    return rows / elapsed
 
 
 def calculate_electronics_discount(price, customer_type):
-    if customer_type == "premium":
-        if price > 1000:
-            return price * 0.20
-        elif price > 500:
-            return price * 0.15
-        else:
-            return price * 0.10
-    elif customer_type == "regular":
-        if price > 1000:
-            return price * 0.10
-        elif price > 500:
-            return price * 0.05
-        else:
-            return price * 0.02
-    else:
-        return 0
+    return global_discount_engine.discount("electronics", customer_type, price)
 
 
 def calculate_clothing_discount(price, customer_type):
-    if customer_type == "premium":
-        if price > 200:
-            return price * 0.25
-        elif price > 100:
-            return price * 0.20
-        else:
-            return price * 0.15
-    elif customer_type == "regular":
-        if price > 200:
-            return price * 0.15
-        elif price > 100:
-            return price * 0.10
-        else:
-            return price * 0.05
-    else:
-        return 0
+    return global_discount_engine.discount("clothing", customer_type, price)
 
 
 def calculate_books_discount(price, customer_type):
-    if customer_type == "premium":
-        if price > 50:
-            return price * 0.30
-        elif price > 30:
-            return price * 0.20
-        else:
-            return price * 0.10
-    elif customer_type == "regular":
-        if price > 50:
-            return price * 0.20
-        elif price > 30:
-            return price * 0.10
-        else:
-            return price * 0.05
-    else:
-        return 0
+    return global_discount_engine.discount("books", customer_type, price)
 
 
 class cache_manager:
-    _instance = None
     
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(cache_manager, cls).__new__(cls)
-            cls._instance.cache = {}
-        return cls._instance
+    def __init__(self, max_entries=10000, max_bytes=None, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.cache = OrderedDict()
+        self.tags = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.generation = 0
+        self.lock = threading.RLock()
     
-    def get(self, key):
-        return self.cache.get(key)
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, size, tags = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self.remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def save(self, key, value, ttl=None, tags=(), generation=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = sys.getsizeof(value)
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return False
+            if key in self.cache:
+                self.remove(key)
+            self.cache[key] = (value, expires_at, size, tuple(tags))
+            self.bytes += size
+            for tag in tags:
+                self.tags.setdefault(tag, set()).add(key)
+            while self.cache and (
+                len(self.cache) > self.max_entries
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                self.remove(next(iter(self.cache)))
+                self.evictions += 1
+        return True
     
-    def save(self, key, value):
-        self.cache[key] = value
+    def remove(self, key):
+        value, expires_at, size, tags = self.cache.pop(key)
+        self.bytes -= size
+        for tag in tags:
+            keys = self.tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tags[tag]
+    
+    def invalidate(self, key):
+        with self.lock:
+            self.generation += 1
+            if key in self.cache:
+                self.remove(key)
+                self.invalidations += 1
+    
+    def invalidate_tags(self, tags):
+        with self.lock:
+            self.generation += 1
+            for tag in tags:
+                for key in list(self.tags.get(tag, ())):
+                    self.remove(key)
+                    self.invalidations += 1
     
     def clear(self):
-        self.cache = {}
+        with self.lock:
+            self.generation += 1
+            self.cache.clear()
+            self.tags.clear()
+            self.bytes = 0
+    
+    def stats(self):
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self.cache),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+
+global_cache = cache_manager()
+
+
+def benchmark_product_lookups(sizes=(1000, 10000, 100000, 500000), queries=200):
+    results = {}
+    for size in sizes:
+        reset_global_state()
+        system = inventory_system()
+        for i in range(size):
+            system.process_everything("add_product", {
+                "id": f"P{i}",
+                "name": f"Producto {i}",
+                "price": 10 + i % 90,
+                "stock": i % 500,
+                "category": f"categoria_{i % 50}"
+            })
+        
+        start = time.perf_counter()
+        for i in range(queries):
+            name = f"Producto {size - 1 - i}"
+            next((prod for prod in system.products.values() if prod["name"] == name), None)
+            [prod for prod in system.products.values() if prod["category"] == f"categoria_{i % 50}"]
+            [prod for prod in system.products.values() if prod["stock"] < 3]
+        scan_elapsed = (time.perf_counter() - start) / queries
+        
+        start = time.perf_counter()
+        for i in range(queries):
+            system.get_product_by_name(f"Producto {size - 1 - i}")
+            system.get_products_by_category(f"categoria_{i % 50}")
+            system.get_low_stock_products(3)
+        index_elapsed = (time.perf_counter() - start) / queries
+        
+        results[size] = (scan_elapsed, index_elapsed)
+        print(f"{size:>8} productos: recorrido {scan_elapsed * 1000:.2f} ms, índices {index_elapsed * 1000:.3f} ms")
+    return results
+
+
+def benchmark_bulk_orders(orders=100000, products=1000, customers=1000):
+    reset_global_state()
+    system = inventory_system()
+    for i in range(products):
+        system.process_everything("add_product", {
+            "id": f"P{i}",
+            "name": f"Producto {i}",
+            "price": 10 + i % 90,
+            "stock": orders
+        })
+    for i in range(customers):
+        system.process_everything("add_customer", {"id": f"C{i}", "name": f"Cliente {i}", "email": f"c{i}@email.com"})
+    
+    batch = [
+        {
+            "customer_id": f"C{i % customers}",
+            "items": [
+                {"product_id": f"P{i % products}", "quantity": 1},
+                {"product_id": f"P{(i * 7) % products}", "quantity": 2}
+            ]
+        }
+        for i in range(orders)
+    ]
+    expected_units = sum(item["quantity"] for order in batch for item in order["items"])
+    stock_before = sum(product["stock"] for product in system.products.values())
+    
+    start = time.perf_counter()
+    results = system.create_orders_bulk(batch)
+    elapsed = time.perf_counter() - start
+    
+    stock_after = sum(product["stock"] for product in system.products.values())
+    print(f"{orders} pedidos en lote: {elapsed:.2f} s, "
+          f"stock correcto: {stock_before - stock_after == expected_units and all(results)}")
+    return elapsed
+
+
+def benchmark_concurrent_orders(threads=(1, 2, 4, 8), orders=20000, products=50, customers=200):
+    results = {}
+    for workers in threads:
+        reset_global_state()
+        system = inventory_system(concurrent=True)
+        for i in range(products):
+            system.process_everything("add_product", {
+                "id": f"P{i}",
+                "name": f"Producto {i}",
+                "price": 10,
+                "stock": orders // products
+            })
+        for i in range(customers):
+            system.process_everything("add_customer", {"id": f"C{i}", "name": f"Cliente {i}", "email": f"c{i}@email.com"})
+        stock_before = sum(product["stock"] for product in system.products.values())
+        
+        batch = [
+            {
+                "customer_id": f"C{random.randrange(customers)}",
+                "items": [
+                    {"product_id": f"P{random.randrange(products)}", "quantity": random.randint(1, 3)},
+                    {"product_id": f"P{random.randrange(products)}", "quantity": random.randint(1, 3)}
+                ]
+            }
+            for i in range(orders)
+        ]
+        
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(lambda order: system.process_everything("create_order", order), batch))
+        elapsed = time.perf_counter() - start
+        
+        sold = sum(
+            item["quantity"]
+            for order, outcome in zip(batch, outcomes) if outcome
+            for item in order["items"]
+        )
+        stock_after = sum(product["stock"] for product in system.products.values())
+        ids = [order["id"] for order in system.orders]
+        consistent = (
+            min(product["stock"] for product in system.products.values()) >= 0
+            and stock_before - stock_after == sold
+            and len(ids) == len(set(ids))
+        )
+        
+        results[workers] = orders / elapsed
+        print(f"{workers} hilos: {results[workers]:.0f} pedidos/s, stock consistente: {consistent}")
+    return results
+
+
+def benchmark_product_store(sizes=(1000000, 10000000), layouts=("dict", "slots", "columnar")):
+    import tracemalloc
+    
+    results = {}
+    for size in sizes:
+        for layout in layouts:
+            tracemalloc.start()
+            store = product_store_layouts[layout]()
+            for i in range(size):
+                store[f"P{i}"] = {
+                    "name": f"Producto {i}",
+                    "price": 10.0 + i % 90,
+                    "stock": i % 500,
+                    "category": ("electronics", "clothing", "books")[i % 3],
+                    "supplier": f"proveedor_{i % 100}"
+                }
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            
+            start = time.perf_counter()
+            inventory_value = 0
+            for product in store.values():
+                inventory_value += product["price"] * product["stock"]
+            scan_elapsed = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            if layout == "dict":
+                sum(product["price"] * product["stock"] for product in store.values())
+            else:
+                store.inventory_value()
+            native_elapsed = time.perf_counter() - start
+            
+            results[(size, layout)] = (memory, scan_elapsed, native_elapsed)
+            print(f"{size:>9} {layout:>8}: {memory / size:.0f} bytes/producto, "
+                  f"recorrido {size / scan_elapsed:.0f} productos/s, "
+                  f"recorrido nativo {size / native_elapsed:.0f} productos/s")
+            del store
+    return results
+
+
+def benchmark_audit_memory(operations=1000000, directory="benchmark_audit", samples=5):
+    import shutil
+    import tracemalloc
+    
+    reset_global_state()
+    system = inventory_system(audit=audit_log(directory, max_segment_bytes=8 * 1024 * 1024, max_segments=4))
+    system.process_everything("add_product", {"id": "P0", "name": "Producto", "price": 10, "stock": 100})
+    
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(operations):
+        system.process_everything("update_stock", {"id": "P0", "quantity": 1 if i % 2 == 0 else -1, "payload": "x" * 100})
+        if (i + 1) % (operations // samples) == 0:
+            print(f"{i + 1:>9} operaciones: {tracemalloc.get_traced_memory()[0] / 1024:.0f} KiB en uso")
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    
+    system.audit.close()
+    shutil.rmtree(directory)
+    print(f"{operations / elapsed:.0f} operaciones auditadas/s")
+    return elapsed
+
+
+def benchmark_alert_pipeline(orders=100000):
+    reset_global_state()
+    system = inventory_system()
+    system.process_everything("add_product", {"id": "P0", "name": "Producto caliente", "price": 10, "stock": orders + 20})
+    system.process_everything("add_customer", {"id": "C0", "name": "Cliente", "email": "c0@email.com"})
+    
+    start = time.perf_counter()
+    for i in range(orders):
+        system.process_everything("create_order", {"customer_id": "C0", "items": [{"product_id": "P0", "quantity": 1}]})
+        if system.products["P0"]["stock"] < 12:
+            system.process_everything("update_stock", {"id": "P0", "quantity": 5})
+    elapsed = time.perf_counter() - start
+    
+    system.alert_engine.flush()
+    print(f"{orders} pedidos: {elapsed:.2f} s, {system.alert_engine.fired} cambios de estado, "
+          f"{len(system.alerts)} alertas emitidas")
+    return elapsed
+
+
+def benchmark_catalogue_repricing(products=5000000, customer_type="premium"):
+    store = columnar_product_store()
+    for i in range(products):
+        store[f"P{i}"] = {
+            "name": f"Producto {i}",
+            "price": 5.0 + i % 1500,
+            "stock": 1,
+            "category": ("electronics", "clothing", "books", "general")[i % 4],
+            "supplier": "unknown"
+        }
+    functions = {
+        "electronics": calculate_electronics_discount,
+        "clothing": calculate_clothing_discount,
+        "books": calculate_books_discount
+    }
+    
+    start = time.perf_counter()
+    for product in store.values():
+        function = functions.get(product["category"])
+        if function:
+            function(product["price"], customer_type)
+    per_call_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    store.discounts(customer_type)
+    engine_elapsed = time.perf_counter() - start
+    
+    print(f"{products} productos: por llamada {per_call_elapsed:.2f} s, motor de descuentos {engine_elapsed:.2f} s")
+    return per_call_elapsed, engine_elapsed
+
+
+def benchmark_cache(queries=100000, products=10000, writes_every=100):
+    reset_global_state()
+    system = inventory_system(cache=cache_manager(max_entries=1000))
+    for i in range(products):
+        system.process_everything("add_product", {
+            "id": f"P{i}",
+            "name": f"Producto {i}",
+            "price": 10,
+            "stock": 5 + i % 100,
+            "category": f"categoria_{i % 20}"
+        })
+    
+    start = time.perf_counter()
+    for i in range(queries):
+        system.get_products_by_category(f"categoria_{i % 20}")
+        if i % writes_every == 0:
+            system.process_everything("update_stock", {"id": f"P{i % products}", "quantity": 1})
+            system.get_low_stock_products(10)
+    elapsed = time.perf_counter() - start
+    
+    stats = system.cache.stats()
+    print(f"{queries} consultas: {elapsed:.2f} s, tasa de aciertos {stats['hit_rate']:.1%}, "
+          f"{stats['invalidations']} invalidaciones, {stats['evictions']} desalojos")
+    return stats
+
+
+def benchmark_snapshot(products=10000000, directory="benchmark_snapshot"):
+    import shutil
+    
+    reset_global_state()
+    system = inventory_system()
+    store = system.products
+    for i in range(products):
+        store[f"P{i}"] = {
+            "name": f"Producto {i}",
+            "price": 10.0 + i % 90,
+            "stock": i % 500,
+            "category": ("electronics", "clothing", "books")[i % 3],
+            "supplier": f"proveedor_{i % 100}"
+        }
+    snapshots = snapshot_manager(directory, system)
+    
+    start = time.perf_counter()
+    snapshots.checkpoint(full=True)
+    full_elapsed = time.perf_counter() - start
+    
+    for i in range(1000):
+        system.set_stock(f"P{i * 7 % products}", 1000 + i)
+    start = time.perf_counter()
+    snapshots.checkpoint()
+    delta_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    snapshots.restore()
+    restore_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    correct = system.products[f"P{999 * 7 % products}"]["stock"] == 1999 and len(system.products) == products
+    lookup_elapsed = time.perf_counter() - start
+    shutil.rmtree(directory)
+    print(f"{products} productos: snapshot completo {full_elapsed:.2f} s, incremental {delta_elapsed * 1000:.1f} ms, "
+          f"restauración {restore_elapsed:.2f} s, primera búsqueda por id {lookup_elapsed:.2f} s, "
+          f"estado correcto: {correct}")
+    return full_elapsed, delta_elapsed, restore_elapsed
+
+
+def benchmark_customer_queries(customers=1000000, queries=100):
+    reset_global_state()
+    store = global_customers
+    now = datetime.datetime.now()
+    for i in range(customers):
+        store[f"C{i}"] = {
+            "name": f"Cliente {i}",
+            "email": f"c{i}@email.com",
+            "type": "regular",
+            "total_purchases": 0,
+            "num_orders": 0,
+            "registration_date": now
+        }
+    
+    start = time.perf_counter()
+    for i in range(customers):
+        global_order_events.publish("order_created", f"C{i}", float((i * 7919) % 1500))
+    events_elapsed = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for i in range(queries):
+        sorted(((store.total_purchases[row], store.ids[row]) for row in range(customers)), reverse=True)[:100]
+    scan_elapsed = (time.perf_counter() - start) / queries
+    
+    start = time.perf_counter()
+    for i in range(queries):
+        store.top_by_spend(100)
+        store.near_threshold(50)
+    index_elapsed = (time.perf_counter() - start) / queries
+    
+    print(f"{customers} clientes: {customers / events_elapsed:.0f} eventos/s, top 100 por recorrido "
+          f"{scan_elapsed * 1000:.1f} ms, por índice {index_elapsed * 1000:.2f} ms")
+    return events_elapsed, scan_elapsed, index_elapsed
 
 
 if __name__ == "__main__":